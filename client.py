@@ -1,6 +1,22 @@
+import os
 import requests
-import time
 import json
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+
+# Shared session: keeps connections alive across calls instead of reconnecting per request
+SESSION = requests.Session()
+SESSION.mount(
+    "http://",
+    HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, backoff_factor=0.2),
+    ),
+)
+SESSION.headers.update({"Connection": "keep-alive"})
 
 
 def upload_model():
@@ -9,30 +25,45 @@ def upload_model():
 
     try:
         with open(model_path, "rb") as f:
-            files = {"file": f}
-            response = requests.post(url, files=files)
-
-        print(response.json())
+            # Stream the multipart body from disk instead of buffering the model in memory
+            encoder = MultipartEncoder(
+                fields={
+                    "file": (
+                        os.path.basename(model_path),
+                        f,
+                        "application/octet-stream",
+                    )
+                }
+            )
+            response = SESSION.post(
+                url, data=encoder, headers={"Content-Type": encoder.content_type}
+            )
+
+        print(orjson.loads(response.content))
     except Exception as e:
         print(f"Upload failed: {e}")
 
 
 def download_result(task_id):
     url = f"http://127.0.0.1:8080/api/download/{task_id}"
-    response = requests.get(url)
-    if response.status_code == 200:
-        with open(f"./models_{task_id}.rknn", "wb") as f:
-            f.write(response.content)
-    else:
-        print(response.json())
+    with SESSION.get(url, stream=True) as response:
+        if response.status_code == 200:
+            # Write in fixed-size chunks instead of holding the whole model in memory
+            with open(f"./models_{task_id}.rknn", "wb") as f:
+                for chunk in response.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+        else:
+            print(orjson.loads(response.content))
 
 
-def query_task():
+def query_task(include_historical=False):
     url = "http://127.0.0.1:8080/api/tasks"
-    response = requests.get(url)
+    # Historical tasks can be numerous, only fetch them when asked for
+    params = None if include_historical else {"historical": "false"}
+    response = SESSION.get(url, params=params)
 
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         tasks = result.get("tasks", [])
 
         print(f"Query task list: {len(tasks)} tasks in total")
@@ -67,15 +98,15 @@ def query_task():
 
         print("-" * 60)
     else:
-        print("Failed to query task list:", response.json())
+        print("Failed to query task list:", orjson.loads(response.content))
 
 
 def query_task_by_id(task_id):
     url = f"http://127.0.0.1:8080/api/tasks/{task_id}"
-    response = requests.get(url)
+    response = SESSION.get(url)
 
     if response.status_code == 200:
-        task = response.json()
+        task = orjson.loads(response.content)
 
         print(f"Query task details: {task_id}")
         print("-" * 40)
@@ -101,10 +132,36 @@ def query_task_by_id(task_id):
         print("-" * 40)
         return task
     else:
-        print("Failed to query task details:", response.json())
+        print("Failed to query task details:", orjson.loads(response.content))
         return None
 
 
+def watch_task(task_id):
+    """Follow task status through the server-sent event stream until it finishes"""
+    url = f"http://127.0.0.1:8080/api/tasks/{task_id}/events"
+    task = None
+
+    with SESSION.get(
+        url, stream=True, headers={"Accept": "text/event-stream"}
+    ) as response:
+        if response.status_code != 200:
+            print("Failed to watch task:", orjson.loads(response.content))
+            return None
+
+        # One persistent connection carries every update, no re-querying needed
+        for line in response.iter_lines():
+            if not line.startswith(b"data:"):
+                continue
+
+            task = orjson.loads(line[len(b"data:") :])
+            print(f"Status: {task['status']}, Progress: {task.get('progress', 0)}%")
+
+            if task["status"] in ["completed", "failed", "cancelled"]:
+                break
+
+    return task
+
+
 def create_task():
     url = "http://127.0.0.1:8080/api/tasks"
 
@@ -121,10 +178,10 @@ def create_task():
         "config": config,  # Optional: use default configuration if not provided
         # No need to specify output_path anymore, server will auto-generate
     }
-    response = requests.post(url, json=data)
-    print("Create task:", response.json())
+    response = SESSION.post(url, json=data)
+    print("Create task:", orjson.loads(response.content))
     if response.status_code == 200:
-        result = response.json()
+        result = orjson.loads(response.content)
         task_id = result["task_id"]
         print(f"Expected output path: {result.get('output_path', 'N/A')}")
         return task_id
@@ -132,10 +189,21 @@ def create_task():
         return None
 
 
+def create_tasks_bulk(specs):
+    """Create several tasks in one request, specs: [{"model_path": ..., "config": {...}}, ...]"""
+    url = "http://127.0.0.1:8080/api/tasks:batch"
+    response = SESSION.post(url, json={"tasks": specs})
+    print("Create tasks:", orjson.loads(response.content))
+    if response.status_code == 200:
+        return orjson.loads(response.content)["task_ids"]
+    else:
+        return None
+
+
 def get_task_logs(task_id):
     url = f"http://127.0.0.1:8080/api/tasks/{task_id}/logs"
-    response = requests.get(url)
-    print("Query task logs:", response.json())
+    response = SESSION.get(url)
+    print("Query task logs:", orjson.loads(response.content))
 
 
 def upload_and_create_task():
@@ -151,24 +219,30 @@ def upload_and_create_task():
         "input_size_list": [[1, 3, 640, 640]],
     }
 
-    data = {
-        "config": json.dumps(
-            config
-        )  # Optional: conversion configuration, use default if not provided
-        # No need to specify output_path anymore, server will auto-generate
-    }
-
     try:
         with open(model_path, "rb") as f:
-            files = {"file": f}
-
-            # Send request using multipart/form-data format
-            response = requests.post(url, data=data, files=files)
-
-        print("Upload and create task:", response.json())
+            encoder = MultipartEncoder(
+                fields={
+                    # Optional: conversion configuration, use default if not provided
+                    # No need to specify output_path anymore, server will auto-generate
+                    "config": json.dumps(config),
+                    "file": (
+                        os.path.basename(model_path),
+                        f,
+                        "application/octet-stream",
+                    ),
+                }
+            )
+
+            # Send request using multipart/form-data format, streamed from disk
+            response = SESSION.post(
+                url, data=encoder, headers={"Content-Type": encoder.content_type}
+            )
+
+        print("Upload and create task:", orjson.loads(response.content))
         print()
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             task_id = result["task_id"]
             print(f"Expected output path: {result.get('output_path', 'N/A')}")
             return task_id
@@ -184,11 +258,8 @@ if __name__ == "__main__":
     # # download_result()
     task_id = upload_and_create_task()
     query_task()
-    while True:
-        task_info = query_task_by_id(task_id)
-        if task_info["status"] == "completed":
-            break
-        time.sleep(5)
-    download_result(task_id)
+    task_info = watch_task(task_id)
+    if task_info and task_info["status"] == "completed":
+        download_result(task_id)
 
     get_task_logs(task_id)
@@ -1,6 +1,118 @@
 from rknn.api import RKNN
+import hashlib
 import os
-from utils.config import RKNNConverterConfig, ModelType
+import queue
+import threading
+import time
+from utils.config import (
+    RKNNConverterConfig,
+    ModelType,
+    DEFAULT_SERVER_CONFIG,
+    ensure_dir,
+)
+from utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Primary file extension -> model type
+_EXT_TO_TYPE = {
+    ".onnx": ModelType.ONNX,
+    ".tflite": ModelType.TFLITE,
+    ".prototxt": ModelType.CAFFE,
+    ".pt": ModelType.PYTORCH,
+    ".pth": ModelType.PYTORCH,
+    ".pytorch": ModelType.PYTORCH,
+    ".pb": ModelType.TENSORFLOW,
+    ".index": ModelType.TENSORFLOW,
+    ".cfg": ModelType.DARKNET,
+}
+
+
+# TFLite cache entries unused for this long are removed when a new one is written (s)
+TFLITE_CACHE_MAX_AGE = 7 * 24 * 3600
+
+
+# Warm RKNN instance for the next conversion in this process. An instance
+# cannot be reused after release(), so a fresh one is built ahead of time.
+_RKNN_POOL = queue.Queue(maxsize=1)
+_rknn_pool_lock = threading.Lock()
+
+
+def prewarm_rknn():
+    """Create an RKNN instance ahead of the next conversion"""
+    with _rknn_pool_lock:
+        if _RKNN_POOL.empty():
+            _RKNN_POOL.put_nowait(RKNN())
+
+
+def _acquire_rknn() -> RKNN:
+    """Take the warm RKNN instance, or create one if none is ready"""
+    # Holding the lock waits for an in-flight prewarm instead of racing it
+    with _rknn_pool_lock:
+        try:
+            return _RKNN_POOL.get_nowait()
+        except queue.Empty:
+            return RKNN()
+
+
+def _evict_tflite_cache(cache_dir: str):
+    """Remove cache files (entries, leftover locks and temp files) unused for too long"""
+    cutoff = time.time() - TFLITE_CACHE_MAX_AGE
+    try:
+        entries = list(os.scandir(cache_dir))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            # Removed concurrently by another worker
+            pass
+
+
+def _saved_model_signature(saved_model_dir: str) -> str:
+    """Digest of the relative path, size and mtime of every SavedModel file (stat only)"""
+    digest = hashlib.blake2b(digest_size=16)
+    for root, dirs, files in os.walk(saved_model_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            st = os.stat(path)
+            rel_path = os.path.relpath(path, saved_model_dir)
+            entry = f"{rel_path}\0{st.st_size}\0{st.st_mtime_ns}\n"
+            digest.update(entry.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _replace_file(path: str, data: bytes):
+    """Write a file atomically, with a per-process temp file so writers never collide"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _saved_model_digest(saved_model_dir: str) -> str:
+    """Content digest of a SavedModel directory, used as TFLite cache key"""
+    digest = hashlib.blake2b(digest_size=16)
+    for root, dirs, files in os.walk(saved_model_dir):
+        dirs.sort()
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, saved_model_dir).encode("utf-8"))
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+    return digest.hexdigest()
 
 
 class RKNNConverter:
@@ -21,31 +133,22 @@ class RKNNConverter:
             config: Conversion configuration
         """
         self.rknn_config: RKNNConverterConfig = config
-        print(self.rknn_config)
+        logger.debug("RKNN converter config: %s", self.rknn_config)
         self.model_files = model_files
         self.model_path = model_files.primary_file  # Compatibility
         self.output_path = output_path
         self.dataset_path = dataset_path
         self.current_model_type = self.check_input_model()
-        self.rknn = RKNN()
+        self.rknn = _acquire_rknn()
         self.config()
 
     def check_input_model(self) -> ModelType:
         """Check input model type"""
         primary_ext = os.path.splitext(self.model_path)[1].lower()
-        print("*********", primary_ext)
-        if primary_ext == ".onnx":
-            return ModelType.ONNX
-        elif primary_ext == ".tflite":
-            return ModelType.TFLITE
-        elif primary_ext == ".prototxt":
-            return ModelType.CAFFE
-        elif primary_ext in [".pt", ".pth", ".pytorch"]:
-            return ModelType.PYTORCH
-        elif primary_ext in [".pb", ".index"]:
-            return ModelType.TENSORFLOW
-        elif primary_ext == ".cfg":
-            return ModelType.DARKNET
+        logger.debug("Primary model extension: %s", primary_ext)
+        model_type = _EXT_TO_TYPE.get(primary_ext)
+        if model_type is not None:
+            return model_type
         elif os.path.isdir(self.model_path):
             # Check if it's a SavedModel directory
             if os.path.exists(os.path.join(self.model_path, "saved_model.pb")):
@@ -60,7 +163,7 @@ class RKNNConverter:
         try:
             self.load_model()
         except Exception as e:
-            print(f"Error: {e}")
+            logger.error("Error: %s", e)
             self.rknn.release()
             return False, e
         if progress_callback is not None:
@@ -69,7 +172,7 @@ class RKNNConverter:
         try:
             self.rknn.build(**self.rknn_config.build_config())
         except Exception as e:
-            print(f"Error: {e}")
+            logger.error("Error: %s", e)
             self.rknn.release()
             return False, e
         if progress_callback is not None:
@@ -78,7 +181,7 @@ class RKNNConverter:
         try:
             self.rknn.export_rknn(self.output_path)
         except Exception as e:
-            print(f"Error: {e}")
+            logger.error("Error: %s", e)
             self.rknn.release()
             return False, e
         if progress_callback is not None:
@@ -102,9 +205,11 @@ class RKNNConverter:
             if os.path.exists(self._temp_tflite_path):
                 try:
                     os.unlink(self._temp_tflite_path)
-                    print(f"Cleaned up temporary TFLite file: {self._temp_tflite_path}")
+                    logger.info(
+                        "Cleaned up temporary TFLite file: %s", self._temp_tflite_path
+                    )
                 except Exception as e:
-                    print(f"Failed to clean up temporary file: {e}")
+                    logger.warning("Failed to clean up temporary file: %s", e)
                 finally:
                     self._temp_tflite_path = None
 
@@ -115,81 +220,132 @@ class RKNNConverter:
                     import shutil
 
                     shutil.rmtree(self._temp_savedmodel_dir)
-                    print(
-                        f"Cleaned up temporary SavedModel directory: {self._temp_savedmodel_dir}"
+                    logger.info(
+                        "Cleaned up temporary SavedModel directory: %s",
+                        self._temp_savedmodel_dir,
                     )
                 except Exception as e:
-                    print(f"Failed to clean up temporary directory: {e}")
+                    logger.warning("Failed to clean up temporary directory: %s", e)
                 finally:
                     self._temp_savedmodel_dir = None
 
     def _save_model2tflite(self, model_path):
-        import tensorflow as tf
+        saved_model_dir = os.path.dirname(model_path)
 
-        tflite_model_path = os.path.join(os.path.dirname(model_path), "model.tflite")
-        if os.path.exists(tflite_model_path):
-            return tflite_model_path
-        converter = tf.lite.TFLiteConverter.from_saved_model(
-            os.path.dirname(model_path)
+        cache_dir = os.path.join(DEFAULT_SERVER_CONFIG.cache_folder, "tflite")
+        ensure_dir(cache_dir)
+
+        # Identical SavedModels map to the same cached TFLite file. Hashing the
+        # content costs about as much as converting, so the digest is remembered
+        # under a stat signature and only computed for files not seen before.
+        key_path = os.path.join(
+            cache_dir, f"{_saved_model_signature(saved_model_dir)}.key"
         )
-        tflite_model = converter.convert()
-        with open(tflite_model_path, "wb") as f:
-            f.write(tflite_model)
+        try:
+            with open(key_path) as f:
+                content_digest = f.read().strip()
+            os.utime(key_path)
+        except FileNotFoundError:
+            content_digest = ""
+        if not content_digest:
+            content_digest = _saved_model_digest(saved_model_dir)
+            _replace_file(key_path, content_digest.encode("utf-8"))
+        tflite_model_path = os.path.join(cache_dir, f"{content_digest}.tflite")
 
+        # Cache hit: refresh the mtime so eviction only removes unused entries
+        try:
+            os.utime(tflite_model_path)
+            return tflite_model_path
+        except FileNotFoundError:
+            pass
+
+        # Lock per cache entry so concurrent workers don't convert the same model twice
+        lock_path = f"{tflite_model_path}.lock"
+        with open(lock_path, "wb") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                # Converted by the worker that held the lock before us
+                if os.path.exists(tflite_model_path):
+                    return tflite_model_path
+
+                import tensorflow as tf
+
+                converter = tf.lite.TFLiteConverter.from_saved_model(saved_model_dir)
+
+                # Write then rename, readers never see a partially written file
+                _replace_file(tflite_model_path, converter.convert())
+            finally:
+                # Removed while held, on success and failure alike. Waiters on this
+                # lock then find the entry, or at worst convert the model themselves.
+                try:
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+
+        _evict_tflite_cache(cache_dir)
         return tflite_model_path
 
     def load_model(self):
         """Load model, supporting multiple file formats"""
-        if self.current_model_type == ModelType.ONNX:
-            self.rknn.load_onnx(self.model_path)
-        elif self.current_model_type == ModelType.TFLITE:
-            self.rknn.load_tflite(self.model_path)
-        elif self.current_model_type == ModelType.CAFFE:
-            # Caffe model requires prototxt and caffemodel files
-            prototxt_path = self.model_path  # Primary file is prototxt
-            caffemodel_path = None
-
-            # Find corresponding caffemodel file
-            for secondary_file in self.model_files.secondary_files:
-                if secondary_file.endswith(".caffemodel"):
-                    caffemodel_path = secondary_file
-                    break
-
-            if not caffemodel_path:
-                raise ValueError("Caffe model missing .caffemodel weight file")
-
-            print(
-                f"Loading Caffe model: prototxt={prototxt_path}, caffemodel={caffemodel_path}"
-            )
-            self.rknn.load_caffe(prototxt_path, blobs=caffemodel_path)
-
-        elif self.current_model_type == ModelType.PYTORCH:
-            self.rknn.load_pytorch(self.model_path, **(self.rknn_config.torch_config()))
-        elif self.current_model_type == ModelType.TENSORFLOW:
-            # Step 1: Convert TensorFlow model to TFLite
-            tflite_model = self._save_model2tflite(self.model_path)
-            self.rknn.load_tflite(
-                tflite_model,  # Input size
-            )
-        elif self.current_model_type == ModelType.DARKNET:
-            # Darknet model requires cfg and weights files
-            cfg_path = self.model_path  # Primary file is cfg
-            weights_path = None
-
-            # Find corresponding weights file
-            for secondary_file in self.model_files.secondary_files:
-                if secondary_file.endswith(".weights"):
-                    weights_path = secondary_file
-                    break
-
-            if not weights_path:
-                raise ValueError("Darknet model missing .weights weight file")
-
-            print(f"Loading Darknet model: cfg={cfg_path}, weights={weights_path}")
-            self.rknn.load_darknet(cfg=cfg_path, weight=weights_path)
-
-        else:
+        loader = self._LOADERS.get(self.current_model_type)
+        if loader is None:
             raise ValueError(f"Unsupported model type: {self.current_model_type}")
+        loader(self)
+
+    def _load_onnx(self):
+        self.rknn.load_onnx(self.model_path)
+
+    def _load_tflite(self):
+        self.rknn.load_tflite(self.model_path)
+
+    def _load_caffe(self):
+        # Caffe model requires prototxt and caffemodel files
+        prototxt_path = self.model_path  # Primary file is prototxt
+        caffemodel_path = self.model_files.get_secondary_file(".caffemodel")
+
+        if not caffemodel_path:
+            raise ValueError("Caffe model missing .caffemodel weight file")
+
+        logger.info(
+            "Loading Caffe model: prototxt=%s, caffemodel=%s",
+            prototxt_path,
+            caffemodel_path,
+        )
+        self.rknn.load_caffe(prototxt_path, blobs=caffemodel_path)
+
+    def _load_pytorch(self):
+        self.rknn.load_pytorch(self.model_path, **(self.rknn_config.torch_config()))
+
+    def _load_tensorflow(self):
+        # Step 1: Convert TensorFlow model to TFLite
+        tflite_model = self._save_model2tflite(self.model_path)
+        self.rknn.load_tflite(
+            tflite_model,  # Input size
+        )
+
+    def _load_darknet(self):
+        # Darknet model requires cfg and weights files
+        cfg_path = self.model_path  # Primary file is cfg
+        weights_path = self.model_files.get_secondary_file(".weights")
+
+        if not weights_path:
+            raise ValueError("Darknet model missing .weights weight file")
+
+        logger.info(
+            "Loading Darknet model: cfg=%s, weights=%s", cfg_path, weights_path
+        )
+        self.rknn.load_darknet(cfg=cfg_path, weight=weights_path)
+
+    # Model type -> loader method
+    _LOADERS = {
+        ModelType.ONNX: _load_onnx,
+        ModelType.TFLITE: _load_tflite,
+        ModelType.CAFFE: _load_caffe,
+        ModelType.PYTORCH: _load_pytorch,
+        ModelType.TENSORFLOW: _load_tensorflow,
+        ModelType.DARKNET: _load_darknet,
+    }
 
 
 if __name__ == "__main__":
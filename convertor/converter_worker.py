@@ -1,15 +1,247 @@
 import asyncio
+import multiprocessing as mp
 import os
+import queue
 import shutil
 import os.path as osp
-from typing import Tuple, Optional
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, Tuple, Optional
 import tempfile
+import threading
 
 from task_manager import TaskInfo
-from utils.config import ConversionTask, ModelFiles
+from utils.config import (
+    ConversionTask,
+    ModelFiles,
+    DEFAULT_SERVER_CONFIG,
+    ensure_dir,
+)
 from utils.logger import TaskLogger
-from convertor.converter import RKNNConverter
+from utils.task_notifier import task_notifier
+from convertor.converter import RKNNConverter, prewarm_rknn
+from convertor.pool_init import init_pool_process
+
+
+def _fastcopy(src: str, dst: str):
+    """Copy a file inside the kernel where possible (copy_file_range), else via shutil"""
+    _copy_contents(src, dst)
+    # Keep the modification time: the TFLite cache recognises staged SavedModels by it
+    st = os.stat(src)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+
+def _copy_contents(src: str, dst: str):
+    """Copy the data of src to dst"""
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+                if remaining == 0:
+                    return
+        except OSError:
+            # Cross-filesystem or unsupported on this kernel, fall back below
+            pass
+    shutil.copyfile(src, dst)
+
+
+# SavedModel layout used to stage TensorFlow inputs: (graph, index)
+_TF_VARIABLES_DIR = "variables"
+_TF_LAYOUT = (
+    "saved_model.pb",
+    osp.join(_TF_VARIABLES_DIR, "variables.index"),
+)
+# Staged name of each variables data shard, formatted with (shard, shard count)
+_TF_DATA_SHARD = osp.join(_TF_VARIABLES_DIR, "variables.data-{:05d}-of-{:05d}")
+
+# Model file extensions accepted by the conversion worker
+SUPPORTED_EXT = frozenset(
+    {".onnx", ".tflite", ".prototxt", ".pytorch", ".pb", ".pt", ".pth", ".darknet"}
+)
+
+# Interval for forwarding progress reported by the conversion process (seconds)
+PROGRESS_POLL_INTERVAL = 0.5
+
+# Conversion process pool, shared by all workers
+_executor: Optional[ProcessPoolExecutor] = None
+_manager = None
+
+
+def _available_cpus() -> list:
+    """CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def start_executor(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Create the conversion process pool (called once at server startup)"""
+    global _executor, _manager
+    if _executor is None:
+        cpus = _available_cpus()
+        max_workers = min(len(cpus), max_workers or DEFAULT_SERVER_CONFIG.max_workers)
+
+        # forkserver: workers start from a clean interpreter, not a copy of the event loop process
+        mp_context = mp.get_context("forkserver")
+        # Preload only the initializer's module instead of __main__, which would
+        # import rknn.api and numpy before the initializer sizes their thread pools
+        mp_context.set_forkserver_preload(["convertor.pool_init"])
+        # Outlives a broken pool: only the pool is rebuilt after a crash
+        if _manager is None:
+            _manager = mp_context.Manager()
+        _executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=init_pool_process,
+            initargs=(cpus, mp_context.Value("i", 0), max_workers),
+        )
+    return _executor
+
+
+def _reset_broken_executor(executor: ProcessPoolExecutor):
+    """Drop a pool broken by a crashed process, the next start_executor() builds a new one"""
+    global _executor
+    # Concurrent tasks all see the same breakage, only the first one resets
+    if _executor is executor:
+        _executor = None
+    executor.shutdown(wait=False)
+
+
+def shutdown_executor():
+    """Shut down the conversion process pool"""
+    global _executor, _manager
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+    if _manager is not None:
+        _manager.shutdown()
+        _manager = None
+
+
+def _drop_page_cache(paths: Iterable[str]):
+    """Tell the kernel the given files' cached pages will not be needed again"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+def _convert_sync(
+    task: ConversionTask,
+    output_path: str,
+    logger: TaskLogger,
+    update_progress: Callable[[float], None],
+) -> Tuple[bool, Optional[str]]:
+    """Execute conversion synchronously (run in a pool process)"""
+    try:
+        logger.info("Loading model...")
+        update_progress(10)
+        if task.model_files.additional_files:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                # Fresh temporary directory, the subdirectory cannot exist yet
+                os.mkdir(osp.join(temp_dir, _TF_VARIABLES_DIR))
+                temp_pb, temp_index = (
+                    osp.join(temp_dir, name) for name in _TF_LAYOUT
+                )
+                # The analyzer lists the data shards in shard order
+                data_files = task.model_files.secondary_files
+                temp_data = [
+                    osp.join(temp_dir, _TF_DATA_SHARD.format(i, len(data_files)))
+                    for i in range(len(data_files))
+                ]
+                for src, dst in zip(data_files, temp_data):
+                    _fastcopy(src, dst)
+                _fastcopy(task.model_files.additional_files[0], temp_index)
+                _fastcopy(task.model_files.primary_file, temp_pb)
+                # Create converter
+                converter = RKNNConverter(
+                    model_files=ModelFiles(
+                        primary_file=temp_pb,
+                        secondary_files=temp_data,
+                        additional_files=[temp_index],
+                    ),
+                    output_path=output_path,
+                    dataset_path=task.get_dataset_path(),
+                    config=task.config,
+                )
+
+                logger.info("Starting conversion...")
+                update_progress(30)
+
+                # Execute conversion
+                success, error = converter.convert(update_progress)
+
+                if success:
+                    logger.info("Conversion completed")
+                    return True, None
+                else:
+                    logger.error("Conversion failed: %s", error)
+                    return False, str(error)
+
+        # Create converter
+        converter = RKNNConverter(
+            model_files=task.model_files,
+            output_path=output_path,
+            dataset_path=task.get_dataset_path(),
+            config=task.config,
+        )
+
+        logger.info("Starting conversion...")
+        update_progress(30)
+
+        # Execute conversion
+        success, error = converter.convert(update_progress)
+
+        if success:
+            logger.info("Conversion completed")
+            return True, None
+        else:
+            logger.error("Conversion failed: %s", error)
+            return False, str(error)
+
+    except Exception as e:
+        error_msg = f"Conversion process exception: {str(e)}"
+        logger.error(error_msg)
+        return False, error_msg
+
+
+def _convert_sync_entry(
+    task: ConversionTask, output_path: str, log_dir: str, progress_queue
+) -> Tuple[bool, Optional[str]]:
+    """Pool process entry point, progress is sent back to the parent through the queue"""
+    task_logger = TaskLogger.get(task.task_id, log_dir)
+    try:
+        result = _convert_sync(task, output_path, task_logger, progress_queue.put)
+    finally:
+        # Pool processes outlive their tasks, don't keep one open log file per task
+        task_logger.close()
+    # Build the next RKNN instance while this process waits for its next task
+    threading.Thread(target=prewarm_rknn, daemon=True).start()
+    return result
+
+
+def _latest_progress(progress_queue) -> Optional[float]:
+    """Drain the progress queued by the pool process, only the latest value matters"""
+    progress = None
+    while True:
+        try:
+            progress = progress_queue.get_nowait()
+        except queue.Empty:
+            return progress
 
 
 class ConverterWorker:
@@ -20,9 +252,12 @@ class ConverterWorker:
         self.task = task_info.task
         self.logger = task_logger
         self.progress = 0.0
+        self._last_logged = -1.0
 
     async def convert(self) -> Tuple[bool, Optional[str]]:
         """Execute model conversion"""
+        # The task has just been started
+        task_notifier.notify(self.task.task_id)
         try:
             self.logger.info("Starting model conversion process")
 
@@ -36,8 +271,17 @@ class ConverterWorker:
             # Execute conversion
             success, error = await self._perform_conversion(output_path)
 
+            # Uploaded inputs are read once, keep them from crowding the page cache.
+            # One open/fadvise per file, off the event loop.
+            model_files = self.task.model_files
+            await asyncio.get_event_loop().run_in_executor(
+                None,
+                _drop_page_cache,
+                (*model_files.get_all_files(), *model_files.additional_files),
+            )
+
             if success:
-                self.logger.info(f"Conversion successful, output file: {output_path}")
+                self.logger.info("Conversion successful, output file: %s", output_path)
                 return True, output_path
             else:
                 return False, error
@@ -47,40 +291,40 @@ class ConverterWorker:
             self.logger.error(error_msg)
             return False, error_msg
 
+        finally:
+            # The task is over, release its log file in this process too
+            self.logger.close()
+            # The task manager records the outcome as soon as this returns,
+            # wake status watchers once it has
+            asyncio.get_event_loop().call_soon(
+                task_notifier.notify, self.task.task_id
+            )
+
     async def _validate_input(self) -> bool:
         """Validate input files"""
         self.logger.info("Validating input files...")
 
-        # Check if model file exists
-        if not os.path.exists(self.task.model_path):
-            self.logger.error(f"Model file does not exist: {self.task.model_path}")
+        # One stat call covers both existence and size
+        try:
+            st = os.stat(self.task.model_path)
+        except OSError:
+            self.logger.error("Model file does not exist: %s", self.task.model_path)
             return False
 
         # Check file size
-        file_size = os.path.getsize(self.task.model_path)
+        file_size = st.st_size
         if file_size == 0:
             self.logger.error("Model file is empty")
             return False
 
         # Check file extension
-        _, ext = os.path.splitext(self.task.model_path)
-        supported_extensions = {
-            ".onnx",
-            ".tflite",
-            ".prototxt",
-            ".pytorch",
-            ".pb",
-            ".pt",
-            ".pth",
-            ".darknet",
-        }
-
-        if ext.lower() not in supported_extensions:
-            self.logger.error(f"Unsupported model format: {ext}")
+        ext = os.path.splitext(self.task.model_path)[1].lower()
+        if ext not in SUPPORTED_EXT:
+            self.logger.error("Unsupported model format: %s", ext)
             return False
 
         self.logger.info(
-            f"Input file validation passed, file size: {file_size / 1024 / 1024:.2f}MB"
+            "Input file validation passed, file size: %.2fMB", file_size / 1048576
         )
         return True
 
@@ -89,15 +333,13 @@ class ConverterWorker:
         self.logger.info("Preparing output path...")
 
         # Use task's get_output_path method to generate output path
-        from utils.config import DEFAULT_SERVER_CONFIG
-
         output_path = self.task.get_output_path(DEFAULT_SERVER_CONFIG.output_folder)
 
         # Ensure output directory exists
         output_dir = os.path.dirname(output_path)
-        os.makedirs(output_dir, exist_ok=True)
+        ensure_dir(output_dir)
 
-        self.logger.info(f"Output path: {output_path}")
+        self.logger.info("Output path: %s", output_path)
         return output_path
 
     async def _perform_conversion(self, output_path: str) -> Tuple[bool, Optional[str]]:
@@ -105,91 +347,56 @@ class ConverterWorker:
         self.logger.info("Starting model conversion execution...")
 
         try:
-            # Execute conversion in thread pool (avoid blocking event loop)
+            # Execute conversion in a pool process (avoid blocking event loop,
+            # keep RKNN SDK state and crashes isolated per task)
+            executor = start_executor()
             loop = asyncio.get_event_loop()
-            success, error = await loop.run_in_executor(
-                None, self._convert_sync, output_path
+            progress_queue = _manager.Queue()
+            future = loop.run_in_executor(
+                executor,
+                _convert_sync_entry,
+                self.task,
+                output_path,
+                self.logger.log_dir,
+                progress_queue,
             )
 
+            # Forward progress reported by the pool process. Reading the Manager
+            # queue is a round trip per item, so it runs off the event loop.
+            while not future.done():
+                await asyncio.wait([future], timeout=PROGRESS_POLL_INTERVAL)
+                progress = await loop.run_in_executor(
+                    None, _latest_progress, progress_queue
+                )
+                if progress is not None:
+                    self._update_progress(progress)
+
+            success, error = future.result()
+
             return success, error
 
-        except Exception as e:
-            error_msg = f"Conversion execution failed: {str(e)}"
+        except BrokenProcessPool:
+            # A pool process died (segfault, OOM kill): fail this task and replace
+            # the pool, which rejects every job once broken
+            _reset_broken_executor(executor)
+            error_msg = "Conversion process terminated abruptly"
             self.logger.error(error_msg)
             return False, error_msg
 
-    def _convert_sync(self, output_path: str) -> Tuple[bool, Optional[str]]:
-        """Execute conversion synchronously (run in thread pool)"""
-        try:
-            self.logger.info("Loading model...")
-            self._update_progress(10)
-            if self.task.model_files.additional_files:
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    os.makedirs(osp.join(temp_dir, "variables"), exist_ok=True)
-                    temp_index = osp.join(temp_dir, "variables", "variables.index")
-                    temp_data = osp.join(
-                        temp_dir, "variables", "variables.data-00000-of-00001"
-                    )
-                    temp_pb = osp.join(temp_dir, "saved_model.pb")
-                    shutil.copy(self.task.model_files.secondary_files[0], temp_data)
-                    shutil.copy(self.task.model_files.additional_files[0], temp_index)
-                    shutil.copy(self.task.model_files.primary_file, temp_pb)
-                    # Create converter
-                    converter = RKNNConverter(
-                        model_files=ModelFiles(
-                            primary_file=temp_pb,
-                            secondary_files=[temp_data],
-                            additional_files=[temp_index],
-                        ),
-                        output_path=output_path,
-                        dataset_path=self.task.get_dataset_path(),
-                        config=self.task.config,
-                    )
-
-                    self.logger.info("Starting conversion...")
-                    self._update_progress(30)
-
-                    # Execute conversion
-                    success, error = converter.convert(self._update_progress)
-
-                    if success:
-                        self.logger.info("Conversion completed")
-                        return True, None
-                    else:
-                        self.logger.error(f"Conversion failed: {error}")
-                        return False, str(error)
-
-            # Create converter
-            converter = RKNNConverter(
-                model_files=self.task.model_files,
-                output_path=output_path,
-                dataset_path=self.task.get_dataset_path(),
-                config=self.task.config,
-            )
-
-            self.logger.info("Starting conversion...")
-            self._update_progress(30)
-
-            # Execute conversion
-            success, error = converter.convert(self._update_progress)
-
-            if success:
-                self.logger.info("Conversion completed")
-                return True, None
-            else:
-                self.logger.error(f"Conversion failed: {error}")
-                return False, str(error)
-
         except Exception as e:
-            error_msg = f"Conversion process exception: {str(e)}"
+            error_msg = f"Conversion execution failed: {str(e)}"
             self.logger.error(error_msg)
             return False, error_msg
 
     def _update_progress(self, progress: float):
         """Update progress"""
         self.progress = progress
-        self.logger.info(f"Conversion progress: {progress}%")
         self.task_info.progress = progress
+        task_notifier.notify(self.task.task_id)
+
+        # Task state is always current, the log only records moves of at least 1%
+        if progress - self._last_logged < 1:
+            return
+        self._last_logged = progress
+        self.logger.info("Conversion progress: %s%%", progress)
 
-        # Progress callback notification can be added here
-        # For example: self.task_manager.update_task_progress(self.task.task_id, progress)
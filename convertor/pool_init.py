@@ -0,0 +1,43 @@
+"""
+Conversion pool process setup
+Kept free of heavy imports: it runs before the RKNN toolkit is loaded in the pool process
+"""
+
+import os
+
+
+def init_pool_process(cpus: list, slot_counter, max_workers: int):
+    """Pool process initializer: pin the process to its own slice of CPUs, warm up RKNN"""
+    # Size native thread pools to the worker's CPU slice. Set in the pool process
+    # only (not inherited by anything else the server starts), before numpy and
+    # rknn.api are imported below.
+    threads = str(max(1, len(cpus) // max_workers))
+    os.environ.setdefault("OMP_NUM_THREADS", threads)
+    os.environ.setdefault("OPENBLAS_NUM_THREADS", threads)
+
+    if hasattr(os, "sched_setaffinity"):
+        _pin_pool_process(cpus, slot_counter, max_workers)
+
+    try:
+        from convertor.converter import prewarm_rknn
+
+        prewarm_rknn()
+    except Exception:
+        # A failing initializer breaks the whole pool, let the task report it instead
+        pass
+
+
+def _pin_pool_process(cpus: list, slot_counter, max_workers: int):
+    """Pin the pool process to the CPU slice of its slot"""
+    with slot_counter.get_lock():
+        slot = slot_counter.value % max_workers
+        slot_counter.value += 1
+
+    # Contiguous slices keep RKNN build threads on neighbouring cores (shared caches)
+    per_worker = max(1, len(cpus) // max_workers)
+    start = (slot * per_worker) % len(cpus)
+    cores = cpus[start : start + per_worker]
+    try:
+        os.sched_setaffinity(0, cores)
+    except OSError:
+        pass
@@ -1,14 +1,18 @@
 # client_discovery.py - Client service discovery
 import socket
-import json
+import select
+import orjson
 import time
-import threading
 import logging
 from typing import List, Dict, Any, Optional
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Linux ioctl requests for an interface's IPv4 address and netmask
+SIOCGIFADDR = 0x8915
+SIOCGIFNETMASK = 0x891B
+
 
 class ServiceDiscoveryClient:
     """Service discovery client"""
@@ -42,38 +46,45 @@ class ServiceDiscoveryClient:
         Returns:
             List of discovered services
         """
-        all_services = []
+        # Clear previous results
+        self.discovered_services = []
 
-        for attempt in range(retry_times):
-            logger.info(f"Discovery attempt {attempt + 1}/{retry_times}")
+        # One socket for the whole discovery, bound before the first request goes out
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        try:
+            sock.bind(("", self.response_port))
+            sock.setblocking(False)
 
-            # Clear previous results
-            self.discovered_services = []
+            logger.info(f"Listening for responses on port {self.response_port}")
 
-            # Start response listener thread
-            listener_thread = threading.Thread(
-                target=self._listen_for_responses, args=(timeout,)
-            )
-            listener_thread.start()
+            for attempt in range(retry_times):
+                logger.info(f"Discovery attempt {attempt + 1}/{retry_times}")
 
-            # Wait for listener to be ready
-            time.sleep(0.1)
+                # Send broadcast request
+                self._send_broadcast_request(service_name)
 
-            # Send broadcast request
-            self._send_broadcast_request(service_name)
+                # Wait for responses until this attempt times out
+                deadline = time.monotonic() + timeout
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    readable, _, _ = select.select([sock], [], [], remaining)
+                    if readable:
+                        self._receive_response(sock)
 
-            # Wait for listener to complete
-            listener_thread.join()
+                if self.discovered_services:
+                    break  # If services found, no need to continue retrying
 
-            # Collect services discovered in this attempt
-            all_services.extend(self.discovered_services)
+                if attempt < retry_times - 1:
+                    logger.info("No services found, retrying...")
 
-            if all_services:
-                break  # If services found, no need to continue retrying
+        finally:
+            sock.close()
 
-            if attempt < retry_times - 1:
-                logger.info(f"No services found, retrying in 1 second...")
-                time.sleep(1)
+        all_services = self.discovered_services
 
         # Remove duplicates (based on IP and port)
         unique_services = []
@@ -99,20 +110,13 @@ class ServiceDiscoveryClient:
             "timestamp": time.time(),
         }
 
-        request_data = json.dumps(request).encode("utf-8")
+        request_data = orjson.dumps(request)
 
-        # Send to broadcast address
+        # Send once to the subnet broadcast address, global broadcast only as fallback
         try:
-            # Try multiple broadcast addresses to ensure coverage of different network configurations
-            broadcast_addresses = [
-                "<broadcast>",  # Default broadcast address
-                "255.255.255.255",  # Global broadcast
-            ]
-
-            # Get local network broadcast address
             local_broadcast = self._get_local_broadcast_address()
-            if local_broadcast:
-                broadcast_addresses.append(local_broadcast)
+            broadcast_addresses = [local_broadcast] if local_broadcast else []
+            broadcast_addresses.append("255.255.255.255")
 
             for broadcast_addr in broadcast_addresses:
                 try:
@@ -120,6 +124,7 @@ class ServiceDiscoveryClient:
                     logger.info(
                         f"Broadcast sent to {broadcast_addr}:{self.broadcast_port}"
                     )
+                    break
                 except Exception as e:
                     logger.warning(f"Failed to send to {broadcast_addr}: {e}")
 
@@ -129,54 +134,57 @@ class ServiceDiscoveryClient:
     def _get_local_broadcast_address(self) -> Optional[str]:
         """Get local network broadcast address"""
         try:
+            import fcntl
             import ipaddress
+            import struct
 
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-
-            # Calculate broadcast address (assuming /24 network)
-            network = ipaddress.IPv4Network(f"{local_ip}/8", strict=False)
-            print(
-                f"Local IP: {local_ip}, Network: {network} , Broadcast: {network.broadcast_address}"
-            )
-            return str(network.broadcast_address)
+            try:
+                s.connect(("8.8.8.8", 80))
+                local_ip = s.getsockname()[0]
+
+                # Find the interface holding local_ip and read its real netmask
+                for _, ifname in socket.if_nameindex():
+                    ifreq = struct.pack("256s", ifname.encode("utf-8")[:15])
+                    try:
+                        if_addr = fcntl.ioctl(s.fileno(), SIOCGIFADDR, ifreq)[20:24]
+                    except OSError:
+                        continue  # No IPv4 address on this interface
+                    if socket.inet_ntoa(if_addr) != local_ip:
+                        continue
+
+                    netmask = socket.inet_ntoa(
+                        fcntl.ioctl(s.fileno(), SIOCGIFNETMASK, ifreq)[20:24]
+                    )
+                    network = ipaddress.IPv4Network(
+                        f"{local_ip}/{netmask}", strict=False
+                    )
+                    logger.info(
+                        f"Local IP: {local_ip}, Network: {network}, Broadcast: {network.broadcast_address}"
+                    )
+                    return str(network.broadcast_address)
+            finally:
+                s.close()
         except Exception:
-            return None
-
-    def _listen_for_responses(self, timeout: float):
-        """Listen for service responses"""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            pass
+        return None
 
+    def _receive_response(self, sock: socket.socket):
+        """Read one service response from the socket"""
         try:
-            sock.bind(("", self.response_port))
-            sock.settimeout(0.5)  # Use shorter timeout for more frequent checking
-
-            logger.info(f"Listening for responses on port {self.response_port}")
-
-            start_time = time.time()
-            while time.time() - start_time < timeout:
-                try:
-                    data, addr = sock.recvfrom(4096)
-                    response = json.loads(data.decode("utf-8"))
-
-                    # Verify it's a service announcement
-                    if response.get("type") == "service_announcement":
-                        response["discovered_from"] = addr[0]
-                        self.discovered_services.append(response)
-                        logger.info(
-                            f"Discovered service at {response.get('ip')}:{response.get('port')}"
-                        )
-
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    logger.error(f"Error processing response: {e}")
-
-        finally:
-            sock.close()
+            data, addr = sock.recvfrom(4096)
+            response = orjson.loads(data)
+
+            # Verify it's a service announcement
+            if response.get("type") == "service_announcement":
+                response["discovered_from"] = addr[0]
+                self.discovered_services.append(response)
+                logger.info(
+                    f"Discovered service at {response.get('ip')}:{response.get('port')}"
+                )
+
+        except Exception as e:
+            logger.error(f"Error processing response: {e}")
 
 
 def discover_model_service():
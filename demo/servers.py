@@ -1,14 +1,96 @@
 # model_service.py - Model conversion server
+"""
+UDP service discovery for the model conversion service.
+
+Tuning for heavy discovery traffic (Linux):
+    sysctl -w net.core.rmem_max=8388608   # allow the requested SO_RCVBUF
+    sysctl -w net.core.wmem_max=8388608   # allow the requested SO_SNDBUF
+    ethtool -G <iface> rx <max>           # larger NIC receive ring
+Pin the NIC's IRQs to cores of its NUMA node; run_model_service() pins
+itself to the same node (see pin_to_nic_numa_node).
+"""
+import asyncio
+import os
 import socket
+import struct
 import json
-import threading
+import orjson
 import time
 import logging
-from typing import Dict, Any
+from collections import OrderedDict
+from typing import Dict, Any, Optional
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default socket buffer size, large enough to absorb bursts of discovery broadcasts
+DEFAULT_SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+
+# SO_RXQ_OVFL is Linux-only and not exported by every Python build (value from asm-generic/socket.h)
+SO_RXQ_OVFL = getattr(socket, "SO_RXQ_OVFL", 40)
+
+# Largest datagram accepted as a discovery request (bytes)
+MAX_REQUEST_SIZE = 4096
+
+# Datagrams handled per socket wakeup before yielding back to the event loop
+MAX_DATAGRAMS_PER_WAKEUP = 64
+
+# Repeated requests from the same source IP within this window get no reply (seconds)
+REPLY_DEDUP_TTL = 0.5
+# Maximum number of source IPs remembered for deduplication
+REPLY_DEDUP_MAXSIZE = 4096
+
+# Interval for re-resolving the local IP, picks up DHCP lease changes (seconds)
+LOCAL_IP_REFRESH_INTERVAL = 60
+
+
+def _default_interface() -> Optional[str]:
+    """Name of the interface carrying the default route"""
+    try:
+        with open("/proc/net/route") as f:
+            next(f)  # Header
+            for line in f:
+                fields = line.split()
+                if fields[1] == "00000000":
+                    return fields[0]
+    except (OSError, StopIteration, IndexError):
+        pass
+    return None
+
+
+def _parse_cpulist(cpulist: str) -> set:
+    """Parse a sysfs CPU list (e.g. 0-7,16-23)"""
+    cpus = set()
+    for part in cpulist.strip().split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            cpus.update(range(int(first), int(last) + 1))
+        elif part:
+            cpus.add(int(part))
+    return cpus
+
+
+def pin_to_nic_numa_node(iface: Optional[str] = None) -> Optional[set]:
+    """Pin the current process to the CPUs of the NIC's NUMA node, return the CPU set used"""
+    iface = iface or _default_interface()
+    if not iface or not hasattr(os, "sched_setaffinity"):
+        return None
+    try:
+        with open(f"/sys/class/net/{iface}/device/numa_node") as f:
+            node = int(f.read())
+        if node < 0:
+            # Single-node machine or virtual NIC, nothing to pin to
+            return None
+        with open(f"/sys/devices/system/node/node{node}/cpulist") as f:
+            cpus = _parse_cpulist(f.read())
+        os.sched_setaffinity(0, cpus)
+    except (OSError, ValueError) as e:
+        logger.info(f"NUMA pinning skipped for {iface}: {e}")
+        return None
+
+    logger.info(f"Pinned to NUMA node {node} of {iface}: CPUs {sorted(cpus)}")
+    return cpus
+
 
 class ModelServiceDiscovery:
     """Service discovery component for model conversion service"""
@@ -19,6 +101,8 @@ class ModelServiceDiscovery:
         service_port: int = 8080,
         broadcast_port: int = 9999,
         service_info: Dict[str, Any] = None,
+        rcvbuf: int = DEFAULT_SOCKET_BUFFER_SIZE,
+        sndbuf: int = DEFAULT_SOCKET_BUFFER_SIZE,
     ):
         """
         Initialize service discovery component
@@ -28,13 +112,25 @@ class ModelServiceDiscovery:
             service_port: HTTP port of model conversion service
             broadcast_port: UDP port for listening to broadcasts
             service_info: Additional service information
+            rcvbuf: UDP receive buffer size requested from the kernel (bytes)
+            sndbuf: UDP send buffer size requested from the kernel (bytes)
         """
         self.service_name = service_name
         self.service_port = service_port
         self.broadcast_port = broadcast_port
         self.service_info = service_info or {}
+        self.rcvbuf = rcvbuf
+        self.sndbuf = sndbuf
         self.running = False
         self.sock = None
+        self.loop = None
+        self._refresh_handle = None
+        self.dropped = 0  # Discovery requests dropped by the kernel (SO_RXQ_OVFL)
+        self.suppressed = 0  # Duplicate discovery requests left unanswered
+        self._recent = OrderedDict()  # Source IP -> time of last reply, oldest first
+        # Receive buffer reused for every datagram; larger requests are truncated and dropped
+        self._recv_buf = bytearray(MAX_REQUEST_SIZE)
+        self._recv_mv = memoryview(self._recv_buf)
 
     def get_local_ip(self):
         """Get local IP address"""
@@ -49,38 +145,138 @@ class ModelServiceDiscovery:
         except Exception:
             return "127.0.0.1"
 
-    def start_listening(self):
-        """Start listening for broadcast requests"""
+    async def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Start answering broadcast requests on the running event loop"""
+        self.loop = loop or asyncio.get_running_loop()
         self.running = True
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            # Lets several listener processes share the port, the kernel spreads
+            # unicast requests across them (broadcasts still reach each one)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self._set_buffer_size(socket.SO_RCVBUF, self.rcvbuf, "net.core.rmem_max")
+        self._set_buffer_size(socket.SO_SNDBUF, self.sndbuf, "net.core.wmem_max")
+        # Have the kernel report its receive queue drop counter with each datagram
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+        except OSError:
+            logger.info("SO_RXQ_OVFL not supported, drop counting disabled")
 
         # Bind to broadcast port
         self.sock.bind(("", self.broadcast_port))
+        self.sock.setblocking(False)
+
+        # Resolve the advertised address once instead of per request
+        self._refresh_endpoints()
+
+        # Readiness callback instead of a polling thread; a raw reader (rather than
+        # a DatagramProtocol) keeps access to recvmsg ancillary data
+        self.loop.add_reader(self.sock.fileno(), self._on_readable)
 
         logger.info(
             f"Model service discovery listening on UDP port {self.broadcast_port}"
         )
 
-        while self.running:
-            try:
-                # Set timeout to check running status
-                self.sock.settimeout(1.0)
-                data, addr = self.sock.recvfrom(1024)
+    def _refresh_endpoints(self):
+        """Resolve the local IP and the advertised endpoints, then schedule the next refresh"""
+        self._local_ip = self.get_local_ip()
+        base_url = f"http://{self._local_ip}:{self.service_port}"
+        self._api_endpoint = f"{base_url}/api"
+        self._health_endpoint = f"{base_url}/api/health"
 
-                # Handle received message
-                self._handle_discovery_request(data, addr)
+        # Pre-serialize the announcement around its timestamp field
+        head = json.dumps(
+            {
+                "type": "service_announcement",
+                "service_name": self.service_name,
+                "ip": self._local_ip,
+                "port": self.service_port,
+                "api_endpoint": self._api_endpoint,
+                "health_endpoint": self._health_endpoint,
+            }
+        )
+        self._response_prefix = (head[:-1] + ', "timestamp": ').encode("utf-8")
+        self._response_suffix = (
+            ', "info": ' + json.dumps(self.service_info) + "}"
+        ).encode("utf-8")
 
-            except socket.timeout:
-                continue
-            except Exception as e:
-                logger.error(f"Error in discovery listener: {e}")
+        # Periodic report of deduplicated requests, piggybacks on the refresh timer
+        if self.suppressed:
+            logger.info(
+                f"Suppressed {self.suppressed} duplicate discovery requests "
+                f"in the last {LOCAL_IP_REFRESH_INTERVAL}s"
+            )
+            self.suppressed = 0
 
-    def _handle_discovery_request(self, data: bytes, addr: tuple):
+        self._refresh_handle = self.loop.call_later(
+            LOCAL_IP_REFRESH_INTERVAL, self._refresh_endpoints
+        )
+
+    def _on_readable(self):
+        """Receive and answer the discovery requests queued on the socket"""
+        # Drain several datagrams per wakeup, capped so a flood cannot starve the loop
+        for _ in range(MAX_DATAGRAMS_PER_WAKEUP):
+            if not self._receive_one():
+                break
+
+    def _receive_one(self) -> bool:
+        """Receive and answer one datagram, return False once the socket is empty"""
+        try:
+            # Receive into the preallocated buffer, no per-datagram allocation
+            nbytes, ancdata, msg_flags, addr = self.sock.recvmsg_into(
+                [self._recv_buf], socket.CMSG_SPACE(4)
+            )
+        except (BlockingIOError, InterruptedError):
+            return False
+        except Exception as e:
+            logger.error(f"Error in discovery listener: {e}")
+            return False
+        self._check_drops(ancdata)
+
+        # Cheap checks first: drop anything that cannot be a discovery request unparsed
+        if (
+            msg_flags & socket.MSG_TRUNC
+            or not nbytes
+            or self._recv_buf[0] != 0x7B  # b"{"
+            or self._recv_buf.find(b'"service_discovery"', 0, nbytes) < 0
+        ):
+            return True
+
+        # Handle received message (before the buffer is reused)
+        self._handle_discovery_request(self._recv_mv[:nbytes], addr)
+        return True
+
+    def _set_buffer_size(self, option: int, size: int, sysctl: str):
+        """Request a socket buffer size and warn if the kernel grants less"""
+        self.sock.setsockopt(socket.SOL_SOCKET, option, size)
+        # The kernel caps the request at the sysctl limit (Linux reports it doubled)
+        granted = self.sock.getsockopt(socket.SOL_SOCKET, option)
+        if granted < size:
+            logger.warning(
+                f"Socket buffer size {granted} is below requested {size}, "
+                f"raise {sysctl} to allow larger buffers"
+            )
+        else:
+            logger.info(f"Socket buffer size set to {granted}")
+
+    def _check_drops(self, ancdata: list):
+        """Log discovery requests the kernel dropped since the last datagram"""
+        for level, kind, cmsg_data in ancdata:
+            if level == socket.SOL_SOCKET and kind == SO_RXQ_OVFL:
+                dropped = struct.unpack("I", cmsg_data[:4])[0]
+                if dropped != self.dropped:
+                    logger.warning(
+                        f"Kernel dropped {(dropped - self.dropped) & 0xFFFFFFFF} discovery "
+                        f"requests (total {dropped}), consider a larger rcvbuf"
+                    )
+                    self.dropped = dropped
+
+    def _handle_discovery_request(self, data: memoryview, addr: tuple):
         """Handle service discovery request"""
         try:
             # Parse request
-            request = json.loads(data.decode("utf-8"))
+            request = orjson.loads(data)
             logger.info(
                 f"Received discovery request from {addr[0]}:{addr[1]} - {request}"
             )
@@ -90,42 +286,62 @@ class ModelServiceDiscovery:
                 "service"
             ) in ["model_conversion", "all", self.service_name]:
 
-                # Prepare response data
-                response = {
-                    "type": "service_announcement",
-                    "service_name": self.service_name,
-                    "ip": self.get_local_ip(),
-                    "port": self.service_port,
-                    "api_endpoint": f"http://{self.get_local_ip()}:{self.service_port}/api",
-                    "health_endpoint": f"http://{self.get_local_ip()}:{self.service_port}/api/health",
-                    "timestamp": time.time(),
-                    "info": self.service_info,
-                }
+                if self._is_duplicate(addr[0]):
+                    return
+
+                # Prepare response data: only the timestamp changes between responses
+                response_data = (
+                    self._response_prefix
+                    + b"%.6f" % time.time()
+                    + self._response_suffix
+                )
 
                 # Use specified response port if provided in request
                 response_port = request.get("response_port", addr[1])
 
-                # Send response
-                response_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                response_data = json.dumps(response).encode("utf-8")
-                response_sock.sendto(response_data, (addr[0], response_port))
-                response_sock.close()
+                # Send response from the listening socket, no per-reply socket needed
+                self.sock.sendto(response_data, (addr[0], response_port))
 
                 logger.info(f"Sent service announcement to {addr[0]}:{response_port}")
 
         except Exception as e:
             logger.error(f"Error handling discovery request: {e}")
 
-    def stop(self):
+    def _is_duplicate(self, ip: str) -> bool:
+        """Check whether this source was answered within REPLY_DEDUP_TTL, otherwise record it"""
+        now = time.monotonic()
+        # Entries are kept in reply order, so expired ones are at the front
+        while self._recent:
+            oldest_ip, replied_at = next(iter(self._recent.items()))
+            if (
+                now - replied_at < REPLY_DEDUP_TTL
+                and len(self._recent) < REPLY_DEDUP_MAXSIZE
+            ):
+                break
+            self._recent.popitem(last=False)
+
+        if ip in self._recent:
+            self.suppressed += 1
+            return True
+        self._recent[ip] = now
+        return False
+
+    async def stop(self):
         """Stop listening"""
         self.running = False
+        if self._refresh_handle:
+            self._refresh_handle.cancel()
+            self._refresh_handle = None
         if self.sock:
+            if self.loop:
+                self.loop.remove_reader(self.sock.fileno())
             self.sock.close()
+            self.sock = None
         logger.info("Service discovery stopped")
 
 
 # Usage example - Integration in model conversion service
-def run_model_service():
+async def run_model_service():
     """Run model conversion service (including service discovery)"""
 
     # Create service discovery component
@@ -140,9 +356,11 @@ def run_model_service():
         },
     )
 
-    # Start service discovery in background thread
-    discovery_thread = threading.Thread(target=discovery.start_listening, daemon=True)
-    discovery_thread.start()
+    # Keep discovery I/O on the NIC's NUMA node
+    pin_to_nic_numa_node()
+
+    # Answer discovery requests on the same event loop as the service itself
+    await discovery.start()
 
     # Your model conversion service main logic here
     logger.info("Model conversion service is running...")
@@ -150,11 +368,13 @@ def run_model_service():
     try:
         # Keep service running
         while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        logger.info("Shutting down...")
-        discovery.stop()
+            await asyncio.sleep(1)
+    finally:
+        await discovery.stop()
 
 
 if __name__ == "__main__":
-    run_model_service()
+    try:
+        asyncio.run(run_model_service())
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
@@ -10,20 +10,33 @@ import sys
 import argparse
 from typing import Optional
 
-import threading
-
 from utils.config import ServerConfig, ensure_directories
 from server import APIServer, ModelServiceDiscovery
 from utils.logger import logger
 
+# Optional faster event loop (libuv based)
+try:
+    import uvloop
+
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    uvloop = None
+    UVLOOP_AVAILABLE = False
+
 
 class RKNNConverterDaemon:
     """RKNN Conversion Daemon"""
 
-    def __init__(self, config: Optional[ServerConfig] = None):
+    def __init__(
+        self,
+        config: Optional[ServerConfig] = None,
+        discovery: Optional[ModelServiceDiscovery] = None,
+    ):
         self.config = config or ServerConfig()
         self.api_server: Optional[APIServer] = None
+        self.discovery = discovery
         self.running = False
+        self._shutdown_event = asyncio.Event()
 
     async def start(self):
         """Start daemon"""
@@ -39,12 +52,16 @@ class RKNNConverterDaemon:
             self.api_server = APIServer(self.config)
             await self.api_server.start()
 
+            # Answer discovery broadcasts on the same event loop
+            if self.discovery:
+                await self.discovery.start(asyncio.get_running_loop())
+
             self.running = True
             logger.info("RKNN conversion daemon started successfully")
 
-            # Keep running
-            while self.running:
-                await asyncio.sleep(1)
+            # Keep running until stop() is called (possibly already during startup),
+            # without periodic wakeups
+            await self._shutdown_event.wait()
 
         except Exception as e:
             logger.error(f"Failed to start daemon: {e}")
@@ -53,28 +70,32 @@ class RKNNConverterDaemon:
 
     async def stop(self):
         """Stop daemon"""
+        # Set even while start() is still starting up: it then returns right after
+        # startup and the caller's stop() tears everything down
+        self._shutdown_event.set()
         if not self.running:
             return
 
         logger.info("Stopping daemon...")
         self.running = False
 
+        if self.discovery:
+            await self.discovery.stop()
+
         if self.api_server:
             await self.api_server.stop()
 
         logger.info("Daemon stopped")
 
 
-def signal_handler(signum, frame):
+def _request_stop(daemon: RKNNConverterDaemon, signum: int, stop_tasks: list):
     """Signal handler"""
     logger.info(f"Received signal {signum}, stopping service...")
-    asyncio.create_task(daemon.stop())
+    stop_tasks.append(asyncio.ensure_future(daemon.stop()))
 
 
 async def main():
     """Main function"""
-    global daemon
-
     # Parse command line arguments
     parser = argparse.ArgumentParser(description="RKNN Model Conversion Daemon")
     parser.add_argument("--host", default="0.0.0.0", help="Server host address")
@@ -108,18 +129,19 @@ async def main():
     )
 
     # Create daemon
-    daemon = RKNNConverterDaemon(config)
     model_service_discovery = ModelServiceDiscovery(
         service_name="model_conversion_service",
         service_port=args.port,
         broadcast_port=9999,
         service_info={"version": "1.0.0"},
     )
-    threading.Thread(target=model_service_discovery.start_listening).start()
+    daemon = RKNNConverterDaemon(config, discovery=model_service_discovery)
 
-    # Register signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    # Register signal handlers on the running loop, so stop() is always scheduled from loop context
+    loop = asyncio.get_running_loop()
+    stop_tasks = []
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, _request_stop, daemon, signum, stop_tasks)
 
     try:
         # Start daemon
@@ -128,11 +150,15 @@ async def main():
         logger.info("Received interrupt signal")
     finally:
         await daemon.stop()
+        # Let a signal-triggered stop finish before the loop shuts down
+        if stop_tasks:
+            await asyncio.gather(*stop_tasks)
 
 
 if __name__ == "__main__":
-    # Global variable
-    daemon: Optional[RKNNConverterDaemon] = None
+    # Use uvloop for the event loop when installed, must happen before the loop is created
+    if UVLOOP_AVAILABLE:
+        uvloop.install()
 
     # Run main function
     asyncio.run(main())
@@ -4,10 +4,24 @@ Multi-file Model Upload Client Example
 Demonstrates how to upload multi-file models like Caffe, Darknet, etc.
 """
 
+import asyncio
+import aiohttp
 import requests
 import json
 import os
+from contextlib import ExitStack
 from typing import List, Dict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared session: uploads and status polls reuse kept-alive connections
+_SESSION = requests.Session()
+_SESSION.mount(
+    "http://",
+    HTTPAdapter(
+        max_retries=Retry(total=5, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+    ),
+)
 
 
 def upload_caffe_model(prototxt_path: str, caffemodel_path: str, config: Dict = None):
@@ -56,13 +70,12 @@ def upload_caffe_model(prototxt_path: str, caffemodel_path: str, config: Dict =
                     ),
                 ),
             ]
-            files = {"file1": prototxt_file, "file2": caffemodel_file}
 
             print(f"🚀 Uploading Caffe model:")
             print(f"   prototxt: {os.path.basename(prototxt_path)}")
             print(f"   caffemodel: {os.path.basename(caffemodel_path)}")
 
-            response = requests.post(url, data=data, files=files)
+            response = _SESSION.post(url, data=data, files=files)
 
         if response.status_code == 200:
             result = response.json()
@@ -126,7 +139,7 @@ def upload_darknet_model(cfg_path: str, weights_path: str, config: Dict = None):
             print(f"   cfg: {os.path.basename(cfg_path)}")
             print(f"   weights: {os.path.basename(weights_path)}")
 
-            response = requests.post(url, data=data, files=files)
+            response = _SESSION.post(url, data=data, files=files)
 
         if response.status_code == 200:
             result = response.json()
@@ -177,7 +190,7 @@ def upload_single_file_model(model_path: str, config: Dict = None):
             print(f"🚀 Uploading single-file model:")
             print(f"   File: {os.path.basename(model_path)}")
 
-            response = requests.post(url, data=data, files=files)
+            response = _SESSION.post(url, data=data, files=files)
 
         if response.status_code == 200:
             result = response.json()
@@ -195,7 +208,7 @@ def upload_single_file_model(model_path: str, config: Dict = None):
         return None
 
 
-def upload_tensorflow_model(
+async def upload_tensorflow_model(
     pb_path: str, additional_files: List[str] = None, config: Dict = None
 ):
     """Upload TensorFlow model (may include multiple files)"""
@@ -214,52 +227,35 @@ def upload_tensorflow_model(
             "dataset": "./images.txt",
         }
 
-    data = {"config": json.dumps(config)}
-
     try:
-        files_to_upload = []
-
-        # Add primary file
-        with open(pb_path, "rb") as pb_file:
-            files_to_upload.append(
-                (
+        # Keep every file open until the request has been sent, aiohttp streams
+        # them from disk while the previous chunk is on the wire
+        with ExitStack() as stack:
+            upload_paths = [pb_path] + [
+                f for f in (additional_files or []) if os.path.exists(f)
+            ]
+            form = aiohttp.FormData()
+            form.add_field("config", json.dumps(config))
+            for file_path in upload_paths:
+                form.add_field(
                     "file",
-                    (
-                        os.path.basename(pb_path),
-                        pb_file.read(),
-                        "application/octet-stream",
-                    ),
+                    stack.enter_context(open(file_path, "rb")),
+                    filename=os.path.basename(file_path),
+                    content_type="application/octet-stream",
                 )
-            )
-
-        # Add additional files
-        if additional_files:
-            for file_path in additional_files:
-                if os.path.exists(file_path):
-                    with open(file_path, "rb") as additional_file:
-                        files_to_upload.append(
-                            (
-                                "file",
-                                (
-                                    os.path.basename(file_path),
-                                    additional_file.read(),
-                                    "application/octet-stream",
-                                ),
-                            )
-                        )
-
-        print(f"🚀 Uploading TensorFlow model:")
-        print(f"   Primary file: {os.path.basename(pb_path)}")
-        print(">>>>>", additional_files)
-        if additional_files:
-            print(
-                f"   Additional files: {[os.path.basename(f) for f in additional_files if os.path.exists(f)]}"
-            )
-        print(len(files_to_upload))
-        response = requests.post(url, data=data, files=files_to_upload)
 
-        if response.status_code == 200:
-            result = response.json()
+            print(f"🚀 Uploading TensorFlow model:")
+            print(f"   Primary file: {os.path.basename(pb_path)}")
+            if additional_files:
+                print(
+                    f"   Additional files: {[os.path.basename(f) for f in upload_paths[1:]]}"
+                )
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, data=form) as response:
+                    status = response.status
+                    result = await response.json()
+
+        if status == 200:
             print(f"✅ Task created successfully!")
             print(f"   Task ID: {result['task_id']}")
             print(f"   Model type: {result['model_type']}")
@@ -268,13 +264,18 @@ def upload_tensorflow_model(
             print(f"   Output path: {result['output_path']}")
             return result["task_id"]
         else:
-            print(f"❌ Failed to create task: {response.json()}")
+            print(f"❌ Failed to create task: {result}")
             return None
     except Exception as e:
         print(f"❌ Upload failed: {e}")
         return None
 
 
+# Task status polling interval bounds (seconds)
+POLL_INITIAL_DELAY = 0.5
+POLL_MAX_DELAY = 10
+
+
 def wait_for_completion(task_id: str):
     """Wait for task completion"""
     import time
@@ -283,9 +284,11 @@ def wait_for_completion(task_id: str):
 
     print(f"⏳ Waiting for task {task_id} to complete...")
 
+    # Poll quickly at first, then back off while the task keeps running
+    delay = POLL_INITIAL_DELAY
     while True:
         try:
-            response = requests.get(url)
+            response = _SESSION.get(url)
             if response.status_code == 200:
                 task_info = response.json()
                 status = task_info["status"]
@@ -313,7 +316,8 @@ def wait_for_completion(task_id: str):
             print(f"❌ Task status query exception: {e}")
             return False
 
-        time.sleep(5)
+        time.sleep(delay)
+        delay = min(delay * 1.5, POLL_MAX_DELAY)
 
 
 def main():
@@ -353,12 +357,14 @@ def main():
     #     prototxt_path=examples["caffe"]["prototxt"],
     #     caffemodel_path=examples["caffe"]["caffemodel"],
     # )
-    task_id = upload_tensorflow_model(
-        pb_path=examples["tensorflow"]["pb"],
-        additional_files=[
-            examples["tensorflow"]["index"],
-            examples["tensorflow"]["data"],
-        ],
+    task_id = asyncio.run(
+        upload_tensorflow_model(
+            pb_path=examples["tensorflow"]["pb"],
+            additional_files=[
+                examples["tensorflow"]["index"],
+                examples["tensorflow"]["data"],
+            ],
+        )
     )
 
     if task_id:
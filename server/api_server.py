@@ -1,21 +1,24 @@
 import asyncio
-import json
+import itertools
 import os
+import orjson
 import uuid
 from typing import Dict, Any, Optional
 from datetime import datetime
 from aiohttp import web
-import aiofiles
 
 from utils.config import (
     ConversionTask,
+    ModelFiles,
     RKNNConverterConfig,
     DEFAULT_SERVER_CONFIG,
     ServerConfig,
     ensure_directories,
 )
 from task_manager import task_manager, TaskStatus
+from convertor.converter_worker import start_executor, shutdown_executor
 from utils.logger import logger
+from utils.task_notifier import task_notifier
 from __version__ import version
 
 # Import model analyzer, handle possible import errors
@@ -28,6 +31,58 @@ except ImportError as e:
     MODEL_ANALYZER_AVAILABLE = False
     model_analyzer = None
 
+# Uploaded chunks buffered between the network reader and the disk writer
+UPLOAD_WRITE_QUEUE_SIZE = 4
+
+# Minimum task list body size before response compression is enabled (bytes)
+LIST_COMPRESSION_MIN_SIZE = 1024
+# Task list bytes accumulated before a piece is written to the client (bytes)
+LIST_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Metadata reported for historical tasks (their original metadata is not kept)
+HISTORICAL_TASK_METADATA = {
+    "note": "This is a historical task completed before program restart"
+}
+
+# Task states after which no further status events are emitted
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+# Longest wait for a change notification before task state is re-read anyway,
+# covers changes made without one (seconds)
+TASK_EVENT_INTERVAL = 5
+# Upper bound of the ?wait= long-poll timeout of the task details endpoint (seconds)
+TASK_WAIT_MAX = 60
+
+
+def _json_response(data: Any, status: int = 200) -> web.Response:
+    """JSON response serialized with orjson (datetimes are emitted as ISO 8601)"""
+    return web.Response(
+        body=orjson.dumps(data), status=status, content_type="application/json"
+    )
+
+
+def _historical_model_name(task_info) -> str:
+    """Model name of a historical task, recovered from its placeholder model path"""
+    return task_info.task.model_path.replace("<Historical Task-", "").replace(">", "")
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int):
+    """Write all of data at offset of fd, retrying partial writes"""
+    # Slicing a memoryview keeps partial writes from copying the remainder
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+def _declared_part_size(field) -> Optional[int]:
+    """Size announced for a multipart part (Content-Length or X-Part-Size header)"""
+    for header in ("Content-Length", "X-Part-Size"):
+        value = field.headers.get(header)
+        if value and value.isdigit():
+            return int(value)
+    return None
+
 
 class APIServer:
     """API Server"""
@@ -36,6 +91,8 @@ class APIServer:
         self.config = config or DEFAULT_SERVER_CONFIG
         # Set client max request size to support large file uploads
         self.app = web.Application(client_max_size=self.config.max_file_size)
+        # task_id -> (task state, serialized /api/tasks entry)
+        self._task_entry_cache: Dict[str, tuple] = {}
         self.setup_routes()
         ensure_directories()
 
@@ -46,9 +103,11 @@ class APIServer:
 
         # Task management
         self.app.router.add_post("/api/tasks", self.create_task)
+        self.app.router.add_post("/api/tasks:batch", self.create_tasks_batch)
         self.app.router.add_get("/api/tasks", self.list_tasks)
         self.app.router.add_get("/api/tasks/{task_id}", self.get_task)
         self.app.router.add_delete("/api/tasks/{task_id}", self.cancel_task)
+        self.app.router.add_get("/api/tasks/{task_id}/events", self.task_events)
 
         # File upload
         self.app.router.add_post("/api/upload", self.upload_file)
@@ -75,11 +134,18 @@ class APIServer:
                 not request.content_type
                 or "multipart/form-data" not in request.content_type
             ):
-                return web.json_response(
+                return _json_response(
                     {"error": "Please use multipart/form-data format to upload files"},
                     status=400,
                 )
 
+            # Reject oversized requests from the declared length, before reading the body
+            if (
+                request.content_length
+                and request.content_length > self.config.max_file_size
+            ):
+                return self._file_size_error(status=413)
+
             reader = await request.multipart()
 
             uploaded_files = []
@@ -90,37 +156,28 @@ class APIServer:
                 if "file" in field.name and field.filename:
                     # Validate file extension
                     _, ext = os.path.splitext(field.filename)
-                    print(field.name, field.filename, field)
-                    print("=" * 100)
-                    if ext.lower() not in self.config.allowed_extensions:
-                        return web.json_response(
+                    if not self.config.is_allowed_extension(ext):
+                        return _json_response(
                             {"error": f"Unsupported file type: {ext}"}, status=400
                         )
 
+                    # Reject a part that declares an oversized body before touching disk
+                    declared_size = _declared_part_size(field)
+                    if declared_size and declared_size > self.config.max_file_size:
+                        return self._file_size_error(status=413)
+
                     # Generate unique filename
                     filename = f"{uuid.uuid4()}{ext}"
                     file_path = os.path.join(self.config.upload_folder, filename)
 
                     # Save file
-                    size = 0
-                    async with aiofiles.open(file_path, "wb") as f:
-                        while True:
-                            chunk = await field.read_chunk(8192)
-                            if not chunk:
-                                break
-                            await f.write(chunk)
-                            size += len(chunk)
-
-                            # Check file size limit
-                            if size > self.config.max_file_size:
-                                await f.close()
-                                os.remove(file_path)
-                                return web.json_response(
-                                    {
-                                        "error": f"File size exceeds limit: {self.config.max_file_size / 1024 / 1024}MB"
-                                    },
-                                    status=400,
-                                )
+                    # A validated Content-Length already bounds every part, only
+                    # chunked (length-less) requests need counting while streaming
+                    size = await self._save_upload_field(
+                        field, file_path, check_size=not request.content_length
+                    )
+                    if size is None:
+                        return self._file_size_error()
 
                     uploaded_files.append(
                         {
@@ -132,12 +189,14 @@ class APIServer:
                     )
                 elif field.name and not field.filename:
                     # Process form fields
-                    field_value = await field.text()
+                    # Small form field: drain it in one read instead of chunk by chunk
+                    field_value = (await field.read(decode=True)).decode(
+                        field.get_charset(default="utf-8")
+                    )
                     if field.name == "config":
                         try:
-                            print("<<<<<<<<", field_value)
-                            config_data = json.loads(field_value) if field_value else {}
-                        except json.JSONDecodeError:
+                            config_data = orjson.loads(field_value) if field_value else {}
+                        except orjson.JSONDecodeError:
                             logger.warning(
                                 f"Config parameter JSON parsing failed, using default config: {field_value}"
                             )
@@ -146,7 +205,7 @@ class APIServer:
                         task_data[field.name] = field_value
 
             if not uploaded_files:
-                return web.json_response(
+                return _json_response(
                     {"error": "No uploaded files found"}, status=400
                 )
 
@@ -154,7 +213,7 @@ class APIServer:
 
             # Analyze uploaded files and organize into model file groups
             if not MODEL_ANALYZER_AVAILABLE:
-                return web.json_response(
+                return _json_response(
                     {
                         "error": "Model analyzer not installed, cannot identify model files"
                     },
@@ -164,7 +223,7 @@ class APIServer:
             try:
                 model_groups = model_analyzer.analyze_uploaded_files(uploaded_files)
                 if not model_groups:
-                    return web.json_response(
+                    return _json_response(
                         {"error": "Cannot identify valid model file format"}, status=400
                     )
 
@@ -174,24 +233,32 @@ class APIServer:
                 # Validate model file integrity
                 is_valid, error_msg = model_analyzer.validate_model_files(model_files)
                 if not is_valid:
-                    return web.json_response(
+                    return _json_response(
                         {"error": f"Model file validation failed: {error_msg}"},
                         status=400,
                     )
 
+                # File names reported in task metadata, the log and the response
+                primary_basename = os.path.basename(model_files.primary_file)
+                secondary_basenames = [
+                    os.path.basename(f) for f in model_files.secondary_files
+                ]
+                additional_basenames = [
+                    os.path.basename(f) for f in model_files.additional_files
+                ]
+
                 logger.info(
-                    f"Identified model type: {model_files.model_type}, primary file: {os.path.basename(model_files.primary_file)}, auxiliary files: {len(model_files.secondary_files)} files"
+                    f"Identified model type: {model_files.model_type}, primary file: {primary_basename}, auxiliary files: {len(model_files.secondary_files)} files"
                 )
 
             except Exception as e:
                 logger.error(f"Model file analysis failed: {e}")
-                return web.json_response(
+                return _json_response(
                     {"error": f"Model file analysis failed: {str(e)}"}, status=500
                 )
 
             # Create conversion config (merge user config with default config)
             try:
-                print("<<<<<<<<", config_data)
                 config = RKNNConverterConfig()
                 config.update_config(config_data)
             except Exception as e:
@@ -200,7 +267,6 @@ class APIServer:
 
             # Generate task ID
             task_id = task_data.get("task_id", str(uuid.uuid4()))
-            print(">>>>>>>>>>", model_files, model_groups)
             # Create task (using model file group)
             task = ConversionTask(
                 task_id=task_id,
@@ -211,15 +277,11 @@ class APIServer:
                 metadata={
                     "model_type": model_files.model_type,
                     "uploaded_files_count": len(uploaded_files),
-                    "primary_file": os.path.basename(model_files.primary_file),
-                    "secondary_files": [
-                        os.path.basename(f) for f in model_files.secondary_files
-                    ],
-                    "additional_files": [
-                        os.path.basename(f) for f in model_files.additional_files
-                    ],
+                    "primary_file": primary_basename,
+                    "secondary_files": secondary_basenames,
+                    "additional_files": additional_basenames,
                     **(
-                        json.loads(task_data.get("metadata", "{}"))
+                        orjson.loads(task_data.get("metadata", "{}"))
                         if task_data.get("metadata")
                         else {}
                     ),
@@ -228,35 +290,129 @@ class APIServer:
 
             # Add to task manager
             final_task_id = task_manager.add_task(task)
+            output_path = task.get_output_path(self.config.output_folder)
 
             logger.info(f"Task created successfully: {final_task_id}")
 
-            return web.json_response(
+            return _json_response(
                 {
                     "task_id": final_task_id,
                     "status": "created",
                     "message": "Task created successfully",
                     "model_type": model_files.model_type,
                     "files_info": {
-                        "primary_file": os.path.basename(model_files.primary_file),
-                        "secondary_files": [
-                            os.path.basename(f) for f in model_files.secondary_files
-                        ],
+                        "primary_file": primary_basename,
+                        "secondary_files": secondary_basenames,
                         "total_files": len(uploaded_files),
                     },
-                    "output_path": task.get_output_path(self.config.output_folder),
+                    "output_path": output_path,
                 }
             )
 
         except Exception as e:
             logger.error(f"Task creation failed: {e}")
-            return web.json_response(
+            return _json_response(
                 {"error": f"Task creation failed: {str(e)}"}, status=500
             )
 
+    def _file_size_error(self, status: int = 400) -> web.Response:
+        """Error response for an upload over max_file_size"""
+        return _json_response(
+            {
+                "error": f"File size exceeds limit: {self.config.max_file_size / 1024 / 1024}MB"
+            },
+            status=status,
+        )
+
+    async def _save_upload_field(
+        self, field, file_path: str, check_size: bool = True
+    ) -> Optional[int]:
+        """Stream an uploaded file field to disk, return its size (None if over the size limit)"""
+        size = 0
+        loop = asyncio.get_event_loop()
+        fd = await loop.run_in_executor(
+            None, os.open, file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644
+        )
+        try:
+            if hasattr(os, "posix_fadvise"):
+                # Written once front to back, let the kernel plan readahead/writeback accordingly
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+            # Reserve the declared size up front: writes then never extend the file,
+            # which avoids per-write metadata updates (and blocking) on ext4
+            declared_size = _declared_part_size(field)
+            if declared_size and declared_size <= self.config.max_file_size:
+                try:
+                    await loop.run_in_executor(
+                        None, os.posix_fallocate, fd, 0, declared_size
+                    )
+                except (AttributeError, OSError):
+                    declared_size = None
+            # Disk writes run in a separate task fed through a bounded queue,
+            # so receiving the next chunk overlaps with writing the previous one
+            write_queue = asyncio.Queue(maxsize=UPLOAD_WRITE_QUEUE_SIZE)
+            writer = asyncio.ensure_future(
+                self._drain_upload_writes(write_queue, self._chunk_writer(fd))
+            )
+            try:
+                while True:
+                    chunk = await field.read_chunk(self.config.upload_chunk_size)
+                    if not chunk:
+                        break
+                    offset = size
+                    size += len(chunk)
+
+                    # Check file size limit
+                    if check_size and size > self.config.max_file_size:
+                        break
+                    await write_queue.put((chunk, offset))
+                await write_queue.put(None)
+                await writer
+
+                # The part was shorter than declared, drop the unused reservation
+                if declared_size and size < declared_size:
+                    await loop.run_in_executor(None, os.ftruncate, fd, size)
+            finally:
+                if not writer.done():
+                    writer.cancel()
+        finally:
+            await loop.run_in_executor(None, os.close, fd)
+
+        if check_size and size > self.config.max_file_size:
+            os.remove(file_path)
+            return None
+        return size
+
+    async def _drain_upload_writes(self, write_queue: asyncio.Queue, write_chunk):
+        """Write queued (chunk, offset) pairs until None, re-raising the first write error"""
+        error = None
+        while True:
+            item = await write_queue.get()
+            if item is None:
+                break
+            # After a failure keep consuming so the producer never blocks on a full queue
+            if error is None:
+                try:
+                    await write_chunk(*item)
+                except Exception as e:
+                    error = e
+        if error is not None:
+            raise error
+
+    def _chunk_writer(self, fd: int):
+        """Build a coroutine writing a chunk at an offset of fd (pwrite in the executor)"""
+        # Buffered file writes block in the kernel, so they always run off the event loop
+        loop = asyncio.get_event_loop()
+
+        async def write_chunk(chunk: bytes, offset: int):
+            # One executor hop per chunk, partial writes are retried in the thread
+            await loop.run_in_executor(None, _pwrite_all, fd, chunk, offset)
+
+        return write_chunk
+
     async def health_check(self, request: web.Request) -> web.Response:
         """Health check endpoint"""
-        return web.json_response(
+        return _json_response(
             {
                 "status": "healthy",
                 "timestamp": datetime.now().isoformat(),
@@ -264,55 +420,57 @@ class APIServer:
             }
         )
 
+    def _build_task(self, data: Dict[str, Any]) -> ConversionTask:
+        """Build a conversion task from a request payload, raising ValueError if invalid"""
+        # Validate required fields
+        required_fields = ["model_path"]
+        for field in required_fields:
+            if field not in data:
+                raise ValueError(f"Missing required field: {field}")
+
+        # Validate if model file exists
+        if not os.path.exists(data["model_path"]):
+            raise ValueError(f'Model file does not exist: {data["model_path"]}')
+
+        # Create conversion config (merge user config with default config)
+        config_data = data.get("config", {})
+        try:
+            config = RKNNConverterConfig(**config_data)
+        except Exception as e:
+            logger.warning(f"Invalid config parameters, using default config: {e}")
+            config = RKNNConverterConfig()
+
+        # Generate task ID
+        task_id = data.get("task_id", str(uuid.uuid4()))
+
+        # Create task (output_path is optional, will be auto-generated by task)
+        return ConversionTask(
+            task_id=task_id,
+            model_files=ModelFiles(primary_file=data["model_path"]),
+            config=config,
+            output_path=data.get("output_path"),  # Optional field
+            callback_url=data.get("callback_url"),
+            priority=data.get("priority", 0),
+            metadata=data.get("metadata", {}),
+        )
+
     async def create_task(self, request: web.Request) -> web.Response:
         """Create conversion task"""
         try:
             # Parse request data
             data = await request.json()
 
-            # Validate required fields
-            required_fields = ["model_path"]
-            for field in required_fields:
-                if field not in data:
-                    return web.json_response(
-                        {"error": f"Missing required field: {field}"}, status=400
-                    )
-
-            # Validate if model file exists
-            if not os.path.exists(data["model_path"]):
-                return web.json_response(
-                    {"error": f'Model file does not exist: {data["model_path"]}'},
-                    status=400,
-                )
-
-            # Create conversion config (merge user config with default config)
-            config_data = data.get("config", {})
             try:
-                config = RKNNConverterConfig(**config_data)
-            except Exception as e:
-                logger.warning(f"Invalid config parameters, using default config: {e}")
-                config = RKNNConverterConfig()
-
-            # Generate task ID
-            task_id = data.get("task_id", str(uuid.uuid4()))
-
-            # Create task (output_path is optional, will be auto-generated by task)
-            task = ConversionTask(
-                task_id=task_id,
-                model_path=data["model_path"],
-                config=config,
-                output_path=data.get("output_path"),  # Optional field
-                callback_url=data.get("callback_url"),
-                priority=data.get("priority", 0),
-                metadata=data.get("metadata", {}),
-            )
+                task = self._build_task(data)
+            except ValueError as e:
+                return _json_response({"error": str(e)}, status=400)
 
             # Add to task manager
             final_task_id = task_manager.add_task(task)
 
             logger.info(f"Task created successfully: {final_task_id}")
 
-            return web.json_response(
+            return _json_response(
                 {
                     "task_id": final_task_id,
                     "status": "created",
@@ -323,57 +481,188 @@ class APIServer:
 
         except Exception as e:
             logger.error(f"Task creation failed: {e}")
-            return web.json_response(
+            return _json_response(
                 {"error": f"Task creation failed: {str(e)}"}, status=500
             )
 
-    async def list_tasks(self, request: web.Request) -> web.Response:
+    async def create_tasks_batch(self, request: web.Request) -> web.Response:
+        """Create multiple conversion tasks in a single request"""
+        try:
+            data = await request.json()
+
+            specs = data.get("tasks")
+            if not isinstance(specs, list) or not specs:
+                return _json_response(
+                    {"error": "Missing required field: tasks"}, status=400
+                )
+
+            # Validate the whole batch first so either every task is queued or none is
+            try:
+                tasks = [self._build_task(spec) for spec in specs]
+            except ValueError as e:
+                return _json_response({"error": str(e)}, status=400)
+
+            # No await in between, so the batch is enqueued without interleaving
+            task_ids = [task_manager.add_task(task) for task in tasks]
+
+            logger.info(f"Batch created successfully: {len(task_ids)} tasks")
+
+            return _json_response(
+                {
+                    "task_ids": task_ids,
+                    "status": "created",
+                    "message": "Tasks created successfully",
+                    "output_paths": [
+                        task.get_output_path(self.config.output_folder)
+                        for task in tasks
+                    ],
+                }
+            )
+
+        except Exception as e:
+            logger.error(f"Batch task creation failed: {e}")
+            return _json_response(
+                {"error": f"Batch task creation failed: {str(e)}"}, status=500
+            )
+
+    async def list_tasks(self, request: web.Request) -> web.StreamResponse:
         """Get task list"""
+        stream = None
         try:
             tasks = task_manager.get_all_tasks()
+            self._prune_task_entry_cache(tasks)
 
-            task_list = []
-            for task_info in tasks:
-                task_data = {
-                    "task_id": task_info.task_id,
-                    "status": task_info.status.value,
-                    "created_at": (
-                        task_info.created_at.isoformat()
-                        if task_info.created_at
-                        else None
-                    ),
-                    "started_at": (
-                        task_info.started_at.isoformat()
-                        if task_info.started_at
-                        else None
-                    ),
-                    "completed_at": (
-                        task_info.completed_at.isoformat()
-                        if task_info.completed_at
-                        else None
-                    ),
-                    "progress": task_info.progress,
-                    "error_message": task_info.error_message,
-                    "result_path": task_info.result_path,
-                    "is_historical": getattr(task_info, "is_historical", False),
-                }
+            # Optional filters: ?status=running&historical=false&after_id=X&limit=100
+            query = request.query
+            status = query.get("status")
+            historical = query.get("historical")
+            after_id = query.get("after_id")
+            try:
+                limit = int(query["limit"]) if "limit" in query else None
+            except ValueError:
+                return _json_response(
+                    {"error": f"Invalid limit: {query['limit']}"}, status=400
+                )
+
+            if after_id:
+                position = next(
+                    (i for i, t in enumerate(tasks) if t.task_id == after_id), None
+                )
+                # An unknown cursor (e.g. a deleted task) cannot be resumed from
+                if position is None:
+                    return _json_response(
+                        {"error": f"Unknown after_id: {after_id}"}, status=400
+                    )
+                tasks = tasks[position + 1 :]
+            # Filters are applied lazily while the list is written out
+            if status:
+                tasks = (t for t in tasks if t.status.value == status)
+            if historical is not None:
+                want_historical = historical.lower() in ("1", "true", "yes")
+                tasks = (
+                    t
+                    for t in tasks
+                    if getattr(t, "is_historical", False) == want_historical
+                )
+            if limit is not None:
+                tasks = itertools.islice(tasks, max(limit, 0))
 
-                # For historical tasks, add additional information
-                if getattr(task_info, "is_historical", False):
-                    task_data["model_name"] = task_info.task.model_path.replace(
-                        "<Historical Task-", ""
-                    ).replace(">", "")
+            # Serialize one task at a time and send the body in pieces, so neither
+            # the task dicts nor the whole JSON document are held at once
+            buffer = bytearray(b'{"tasks":[')
+            total = 0
+            for task_info in tasks:
+                if total:
+                    buffer += b","
+                buffer += self._serialized_task_entry(task_info)
+                total += 1
+                if len(buffer) >= LIST_STREAM_CHUNK_SIZE:
+                    if stream is None:
+                        stream = web.StreamResponse()
+                        stream.content_type = "application/json"
+                        # Task lists are repetitive JSON, compress them (if the client accepts it)
+                        stream.enable_compression()
+                        await stream.prepare(request)
+                    await stream.write(bytes(buffer))
+                    buffer.clear()
+            buffer += b'],"total":%d}' % total
+
+            if stream is None:
+                # The whole list fit in one piece, send it as a regular response
+                response = web.Response(
+                    body=bytes(buffer), content_type="application/json"
+                )
+                if len(buffer) >= LIST_COMPRESSION_MIN_SIZE:
+                    response.enable_compression()
+                return response
 
-                task_list.append(task_data)
+            await stream.write(bytes(buffer))
+            await stream.write_eof()
+            return stream
 
-            return web.json_response({"tasks": task_list, "total": len(task_list)})
+        except ConnectionResetError:
+            logger.info("Task list client disconnected")
+            return stream
 
         except Exception as e:
             logger.error(f"Failed to get task list: {e}")
-            return web.json_response(
+            if stream is not None:
+                # Headers are already sent, an error body can no longer be returned
+                raise
+            return _json_response(
                 {"error": f"Failed to get task list: {str(e)}"}, status=500
             )
 
+    def _serialized_task_entry(self, task_info) -> bytes:
+        """Serialized task list entry, re-encoded only when the task state changed"""
+        state = (
+            task_info.status,
+            task_info.progress,
+            task_info.error_message,
+            task_info.result_path,
+            task_info.started_at,
+            task_info.completed_at,
+        )
+        cached = self._task_entry_cache.get(task_info.task_id)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+
+        entry = orjson.dumps(self._task_list_entry(task_info))
+        self._task_entry_cache[task_info.task_id] = (state, entry)
+        return entry
+
+    def _prune_task_entry_cache(self, tasks: list):
+        """Drop cached entries of tasks the task manager no longer knows"""
+        if len(self._task_entry_cache) <= len(tasks):
+            return
+        live_ids = {task_info.task_id for task_info in tasks}
+        self._task_entry_cache = {
+            task_id: cached
+            for task_id, cached in self._task_entry_cache.items()
+            if task_id in live_ids
+        }
+
+    def _task_list_entry(self, task_info) -> Dict[str, Any]:
+        """Task summary as listed by /api/tasks"""
+        is_historical = getattr(task_info, "is_historical", False)
+        task_data = {
+            "task_id": task_info.task_id,
+            "status": task_info.status.value,
+            "created_at": task_info.created_at,
+            "started_at": task_info.started_at,
+            "completed_at": task_info.completed_at,
+            "progress": task_info.progress,
+            "error_message": task_info.error_message,
+            "result_path": task_info.result_path,
+            "is_historical": is_historical,
+        }
+
+        # For historical tasks, add additional information
+        if is_historical:
+            task_data["model_name"] = _historical_model_name(task_info)
+
+        return task_data
+
     async def get_task(self, request: web.Request) -> web.Response:
         """Get task details"""
         try:
@@ -381,50 +670,101 @@ class APIServer:
             task_info = task_manager.get_task(task_id)
 
             if not task_info:
-                return web.json_response(
+                return _json_response(
                     {"error": f"Task does not exist: {task_id}"}, status=404
                 )
 
+            # Long-poll fallback for clients without SSE: ?wait=30 holds the
+            # request until the task changes or the timeout expires
+            if "wait" in request.query:
+                try:
+                    wait = min(float(request.query["wait"]), TASK_WAIT_MAX)
+                except ValueError:
+                    return _json_response(
+                        {"error": f"Invalid wait: {request.query['wait']}"},
+                        status=400,
+                    )
+                if wait > 0 and task_info.status.value not in TERMINAL_STATUSES:
+                    await task_notifier.wait(task_id, wait)
+                    task_info = task_manager.get_task(task_id) or task_info
+
+            is_historical = getattr(task_info, "is_historical", False)
             task_data = {
                 "task_id": task_info.task_id,
                 "status": task_info.status.value,
-                "created_at": (
-                    task_info.created_at.isoformat() if task_info.created_at else None
-                ),
-                "started_at": (
-                    task_info.started_at.isoformat() if task_info.started_at else None
-                ),
-                "completed_at": (
-                    task_info.completed_at.isoformat()
-                    if task_info.completed_at
-                    else None
-                ),
+                "created_at": task_info.created_at,
+                "started_at": task_info.started_at,
+                "completed_at": task_info.completed_at,
                 "progress": task_info.progress,
                 "error_message": task_info.error_message,
                 "result_path": task_info.result_path,
-                "is_historical": getattr(task_info, "is_historical", False),
+                "is_historical": is_historical,
             }
 
             # For non-historical tasks, add complete metadata
-            if not getattr(task_info, "is_historical", False):
+            if not is_historical:
                 task_data["metadata"] = task_info.task.metadata
             else:
                 # For historical tasks, add inferred information
-                task_data["model_name"] = task_info.task.model_path.replace(
-                    "<Historical Task-", ""
-                ).replace(">", "")
-                task_data["metadata"] = {
-                    "note": "This is a historical task completed before program restart"
-                }
+                task_data["model_name"] = _historical_model_name(task_info)
+                task_data["metadata"] = HISTORICAL_TASK_METADATA
 
-            return web.json_response(task_data)
+            return _json_response(task_data)
 
         except Exception as e:
             logger.error(f"Failed to get task details: {e}")
-            return web.json_response(
+            return _json_response(
                 {"error": f"Failed to get task details: {str(e)}"}, status=500
             )
 
+    async def task_events(self, request: web.Request) -> web.StreamResponse:
+        """Stream task status changes as server-sent events"""
+        task_id = request.match_info["task_id"]
+        task_info = task_manager.get_task(task_id)
+
+        if not task_info:
+            return _json_response(
+                {"error": f"Task does not exist: {task_id}"}, status=404
+            )
+
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"}
+        )
+        await response.prepare(request)
+
+        try:
+            last_state = None
+            while task_info:
+                # Only push an event when something the client cares about changed
+                state = (
+                    task_info.status.value,
+                    task_info.progress,
+                    task_info.error_message,
+                )
+                if state != last_state:
+                    last_state = state
+                    event = {
+                        "task_id": task_id,
+                        "status": task_info.status.value,
+                        "progress": task_info.progress,
+                        "error_message": task_info.error_message,
+                        "result_path": task_info.result_path,
+                    }
+                    await response.write(b"data: " + orjson.dumps(event) + b"\n\n")
+
+                if task_info.status.value in TERMINAL_STATUSES:
+                    break
+
+                # Woken by the conversion worker as soon as the task changes
+                await task_notifier.wait(task_id, TASK_EVENT_INTERVAL)
+                task_info = task_manager.get_task(task_id)
+
+            await response.write_eof()
+        except ConnectionResetError:
+            logger.info(f"Event stream client disconnected: {task_id}")
+
+        return response
+
     async def cancel_task(self, request: web.Request) -> web.Response:
         """Cancel task"""
         try:
@@ -432,17 +772,18 @@ class APIServer:
             success = task_manager.cancel_task(task_id)
 
             if success:
-                return web.json_response(
+                task_notifier.notify(task_id)
+                return _json_response(
                     {"message": f"Task {task_id} has been cancelled"}
                 )
             else:
-                return web.json_response(
+                return _json_response(
                     {"error": f"Failed to cancel task: {task_id}"}, status=400
                 )
 
         except Exception as e:
             logger.error(f"Failed to cancel task: {e}")
-            return web.json_response(
+            return _json_response(
                 {"error": f"Failed to cancel task: {str(e)}"}, status=500
             )
 
@@ -454,11 +795,18 @@ class APIServer:
                 not request.content_type
                 or "multipart/form-data" not in request.content_type
             ):
-                return web.json_response(
+                return _json_response(
                     {"error": "Please use multipart/form-data format to upload files"},
                     status=400,
                 )
 
+            # Reject oversized requests from the declared length, before reading the body
+            if (
+                request.content_length
+                and request.content_length > self.config.max_file_size
+            ):
+                return self._file_size_error(status=413)
+
             # Parse multipart data
             reader = await request.multipart()
 
@@ -468,35 +816,28 @@ class APIServer:
                 if field.name == "file" and field.filename:
                     # Validate file extension
                     _, ext = os.path.splitext(field.filename)
-                    if ext.lower() not in self.config.allowed_extensions:
-                        return web.json_response(
+                    if not self.config.is_allowed_extension(ext):
+                        return _json_response(
                             {"error": f"Unsupported file type: {ext}"}, status=400
                         )
 
+                    # Reject a part that declares an oversized body before touching disk
+                    declared_size = _declared_part_size(field)
+                    if declared_size and declared_size > self.config.max_file_size:
+                        return self._file_size_error(status=413)
+
                     # Generate unique filename
                     filename = f"{uuid.uuid4()}{ext}"
                     file_path = os.path.join(self.config.upload_folder, filename)
 
                     # Save file
-                    size = 0
-                    async with aiofiles.open(file_path, "wb") as f:
-                        while True:
-                            chunk = await field.read_chunk(8192)
-                            if not chunk:
-                                break
-                            await f.write(chunk)
-                            size += len(chunk)
-
-                            # Check file size limit
-                            if size > self.config.max_file_size:
-                                await f.close()
-                                os.remove(file_path)
-                                return web.json_response(
-                                    {
-                                        "error": f"File size exceeds limit: {self.config.max_file_size / 1024 / 1024}MB"
-                                    },
-                                    status=400,
-                                )
+                    # A validated Content-Length already bounds every part, only
+                    # chunked (length-less) requests need counting while streaming
+                    size = await self._save_upload_field(
+                        field, file_path, check_size=not request.content_length
+                    )
+                    if size is None:
+                        return self._file_size_error()
 
                     uploaded_files.append(
                         {
@@ -508,19 +849,19 @@ class APIServer:
                     )
 
             if not uploaded_files:
-                return web.json_response(
+                return _json_response(
                     {"error": "No uploaded files found"}, status=400
                 )
 
             logger.info(f"File upload successful: {len(uploaded_files)} files")
 
-            return web.json_response(
+            return _json_response(
                 {"message": "File upload successful", "files": uploaded_files}
             )
 
         except Exception as e:
             logger.error(f"File upload failed: {e}")
-            return web.json_response(
+            return _json_response(
                 {"error": f"File upload failed: {str(e)}"}, status=500
             )
 
@@ -531,12 +872,12 @@ class APIServer:
             task_info = task_manager.get_task(task_id)
 
             if not task_info:
-                return web.json_response(
+                return _json_response(
                     {"error": f"Task does not exist: {task_id}"}, status=404
                 )
 
             if task_info.status != TaskStatus.COMPLETED:
-                return web.json_response(
+                return _json_response(
                     {
                         "error": f"Task not completed yet, current status: {task_info.status.value}"
                     },
@@ -544,19 +885,23 @@ class APIServer:
                 )
 
             if not task_info.result_path or not os.path.exists(task_info.result_path):
-                return web.json_response(
+                return _json_response(
                     {"error": "Conversion result file does not exist"}, status=404
                 )
 
-            # Return file
+            # Return file: aiohttp sends it with sendfile(2) when the transport allows,
+            # chunk_size only sizes the reads of its fallback path (e.g. TLS).
+            # Range requests are served as well, so interrupted downloads can resume
             return web.FileResponse(
                 path=task_info.result_path,
+                chunk_size=self.config.download_chunk_size,
+                headers={"Accept-Ranges": "bytes"},
                 # filename=os.path.basename(task_info.result_path)
             )
 
         except Exception as e:
             logger.error(f"File download failed: {e}")
-            return web.json_response(
+            return _json_response(
                 {"error": f"File download failed: {str(e)}"}, status=500
             )
 
@@ -567,15 +912,15 @@ class APIServer:
             task_info = task_manager.get_task(task_id)
 
             if not task_info:
-                return web.json_response(
+                return _json_response(
                     {"error": f"Task does not exist: {task_id}"}, status=404
                 )
 
-            return web.json_response({"task_id": task_id, "logs": task_info.logs})
+            return _json_response({"task_id": task_id, "logs": task_info.logs})
 
         except Exception as e:
             logger.error(f"Failed to get task logs: {e}")
-            return web.json_response(
+            return _json_response(
                 {"error": f"Failed to get task logs: {str(e)}"}, status=500
             )
 
@@ -586,6 +931,9 @@ class APIServer:
         # Set task manager output directory
         task_manager.set_output_folder(self.config.output_folder)
 
+        # Start conversion process pool
+        start_executor(self.config.max_workers)
+
         # Start task manager
         await task_manager.start()
 
@@ -607,4 +955,7 @@ class APIServer:
         # Stop task manager
         await task_manager.stop()
 
+        # Stop conversion process pool
+        shutdown_executor()
+
         logger.info("API server stopped")
@@ -0,0 +1,286 @@
+"""
+UDP service discovery for the model conversion service.
+
+Answers discovery broadcasts from clients on the daemon's event loop, see
+demo/servers.py for a standalone version and demo/client.py for the client.
+"""
+
+import asyncio
+import json
+import socket
+import struct
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import orjson
+
+from utils.logger import logger
+
+# Default socket buffer size, large enough to absorb bursts of discovery broadcasts
+DEFAULT_SOCKET_BUFFER_SIZE = 4 * 1024 * 1024
+
+# SO_RXQ_OVFL is Linux-only and not exported by every Python build (value from asm-generic/socket.h)
+SO_RXQ_OVFL = getattr(socket, "SO_RXQ_OVFL", 40)
+
+# Largest datagram accepted as a discovery request (bytes)
+MAX_REQUEST_SIZE = 4096
+
+# Datagrams handled per socket wakeup before yielding back to the event loop
+MAX_DATAGRAMS_PER_WAKEUP = 64
+
+# Repeated requests from the same source IP within this window get no reply (seconds)
+REPLY_DEDUP_TTL = 0.5
+# Maximum number of source IPs remembered for deduplication
+REPLY_DEDUP_MAXSIZE = 4096
+
+# Interval for re-resolving the local IP, picks up DHCP lease changes (seconds)
+LOCAL_IP_REFRESH_INTERVAL = 60
+
+
+class ModelServiceDiscovery:
+    """Service discovery component for model conversion service"""
+
+    def __init__(
+        self,
+        service_name: str = "model_conversion_service",
+        service_port: int = 8080,
+        broadcast_port: int = 9999,
+        service_info: Dict[str, Any] = None,
+        rcvbuf: int = DEFAULT_SOCKET_BUFFER_SIZE,
+        sndbuf: int = DEFAULT_SOCKET_BUFFER_SIZE,
+    ):
+        """
+        Initialize service discovery component
+
+        Args:
+            service_name: Service name
+            service_port: HTTP port of model conversion service
+            broadcast_port: UDP port for listening to broadcasts
+            service_info: Additional service information
+            rcvbuf: UDP receive buffer size requested from the kernel (bytes)
+            sndbuf: UDP send buffer size requested from the kernel (bytes)
+        """
+        self.service_name = service_name
+        self.service_port = service_port
+        self.broadcast_port = broadcast_port
+        self.service_info = service_info or {}
+        self.rcvbuf = rcvbuf
+        self.sndbuf = sndbuf
+        self.running = False
+        self.sock = None
+        self.loop = None
+        self._refresh_handle = None
+        self.dropped = 0  # Discovery requests dropped by the kernel (SO_RXQ_OVFL)
+        self.suppressed = 0  # Duplicate discovery requests left unanswered
+        self._recent = OrderedDict()  # Source IP -> time of last reply, oldest first
+        # Receive buffer reused for every datagram; larger requests are truncated and dropped
+        self._recv_buf = bytearray(MAX_REQUEST_SIZE)
+        self._recv_mv = memoryview(self._recv_buf)
+
+    def get_local_ip(self):
+        """Get local IP address"""
+        try:
+            # Create a UDP socket connection to external address (without actually sending data)
+            # This method can get the correct LAN IP
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            s.connect(("8.8.8.8", 80))
+            local_ip = s.getsockname()[0]
+            s.close()
+            return local_ip
+        except Exception:
+            return "127.0.0.1"
+
+    async def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Start answering broadcast requests on the running event loop"""
+        self.loop = loop or asyncio.get_running_loop()
+        self.running = True
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            # Lets several listener processes share the port, the kernel spreads
+            # unicast requests across them (broadcasts still reach each one)
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        self._set_buffer_size(socket.SO_RCVBUF, self.rcvbuf, "net.core.rmem_max")
+        self._set_buffer_size(socket.SO_SNDBUF, self.sndbuf, "net.core.wmem_max")
+        # Have the kernel report its receive queue drop counter with each datagram
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, SO_RXQ_OVFL, 1)
+        except OSError:
+            logger.info("SO_RXQ_OVFL not supported, drop counting disabled")
+
+        # Bind to broadcast port
+        self.sock.bind(("", self.broadcast_port))
+        self.sock.setblocking(False)
+
+        # Resolve the advertised address once instead of per request
+        self._refresh_endpoints()
+
+        # Readiness callback instead of a polling thread; a raw reader (rather than
+        # a DatagramProtocol) keeps access to recvmsg ancillary data
+        self.loop.add_reader(self.sock.fileno(), self._on_readable)
+
+        logger.info(
+            f"Model service discovery listening on UDP port {self.broadcast_port}"
+        )
+
+    def _refresh_endpoints(self):
+        """Resolve the local IP and the advertised endpoints, then schedule the next refresh"""
+        self._local_ip = self.get_local_ip()
+        base_url = f"http://{self._local_ip}:{self.service_port}"
+        self._api_endpoint = f"{base_url}/api"
+        self._health_endpoint = f"{base_url}/api/health"
+
+        # Pre-serialize the announcement around its timestamp field
+        head = json.dumps(
+            {
+                "type": "service_announcement",
+                "service_name": self.service_name,
+                "ip": self._local_ip,
+                "port": self.service_port,
+                "api_endpoint": self._api_endpoint,
+                "health_endpoint": self._health_endpoint,
+            }
+        )
+        self._response_prefix = (head[:-1] + ', "timestamp": ').encode("utf-8")
+        self._response_suffix = (
+            ', "info": ' + json.dumps(self.service_info) + "}"
+        ).encode("utf-8")
+
+        # Periodic report of deduplicated requests, piggybacks on the refresh timer
+        if self.suppressed:
+            logger.info(
+                f"Suppressed {self.suppressed} duplicate discovery requests "
+                f"in the last {LOCAL_IP_REFRESH_INTERVAL}s"
+            )
+            self.suppressed = 0
+
+        self._refresh_handle = self.loop.call_later(
+            LOCAL_IP_REFRESH_INTERVAL, self._refresh_endpoints
+        )
+
+    def _on_readable(self):
+        """Receive and answer the discovery requests queued on the socket"""
+        # Drain several datagrams per wakeup, capped so a flood cannot starve the loop
+        for _ in range(MAX_DATAGRAMS_PER_WAKEUP):
+            if not self._receive_one():
+                break
+
+    def _receive_one(self) -> bool:
+        """Receive and answer one datagram, return False once the socket is empty"""
+        try:
+            # Receive into the preallocated buffer, no per-datagram allocation
+            nbytes, ancdata, msg_flags, addr = self.sock.recvmsg_into(
+                [self._recv_buf], socket.CMSG_SPACE(4)
+            )
+        except (BlockingIOError, InterruptedError):
+            return False
+        except Exception as e:
+            logger.error(f"Error in discovery listener: {e}")
+            return False
+        self._check_drops(ancdata)
+
+        # Cheap checks first: drop anything that cannot be a discovery request unparsed
+        if (
+            msg_flags & socket.MSG_TRUNC
+            or not nbytes
+            or self._recv_buf[0] != 0x7B  # b"{"
+            or self._recv_buf.find(b'"service_discovery"', 0, nbytes) < 0
+        ):
+            return True
+
+        # Handle received message (before the buffer is reused)
+        self._handle_discovery_request(self._recv_mv[:nbytes], addr)
+        return True
+
+    def _set_buffer_size(self, option: int, size: int, sysctl: str):
+        """Request a socket buffer size and warn if the kernel grants less"""
+        self.sock.setsockopt(socket.SOL_SOCKET, option, size)
+        # The kernel caps the request at the sysctl limit (Linux reports it doubled)
+        granted = self.sock.getsockopt(socket.SOL_SOCKET, option)
+        if granted < size:
+            logger.warning(
+                f"Socket buffer size {granted} is below requested {size}, "
+                f"raise {sysctl} to allow larger buffers"
+            )
+        else:
+            logger.info(f"Socket buffer size set to {granted}")
+
+    def _check_drops(self, ancdata: list):
+        """Log discovery requests the kernel dropped since the last datagram"""
+        for level, kind, cmsg_data in ancdata:
+            if level == socket.SOL_SOCKET and kind == SO_RXQ_OVFL:
+                dropped = struct.unpack("I", cmsg_data[:4])[0]
+                if dropped != self.dropped:
+                    logger.warning(
+                        f"Kernel dropped {(dropped - self.dropped) & 0xFFFFFFFF} discovery "
+                        f"requests (total {dropped}), consider a larger rcvbuf"
+                    )
+                    self.dropped = dropped
+
+    def _handle_discovery_request(self, data: memoryview, addr: tuple):
+        """Handle service discovery request"""
+        try:
+            # Parse request
+            request = orjson.loads(data)
+            logger.info(
+                f"Received discovery request from {addr[0]}:{addr[1]} - {request}"
+            )
+
+            # Check if it's a service discovery request
+            if request.get("type") == "service_discovery" and request.get(
+                "service"
+            ) in ["model_conversion", "all", self.service_name]:
+
+                if self._is_duplicate(addr[0]):
+                    return
+
+                # Prepare response data: only the timestamp changes between responses
+                response_data = (
+                    self._response_prefix
+                    + b"%.6f" % time.time()
+                    + self._response_suffix
+                )
+
+                # Use specified response port if provided in request
+                response_port = request.get("response_port", addr[1])
+
+                # Send response from the listening socket, no per-reply socket needed
+                self.sock.sendto(response_data, (addr[0], response_port))
+
+                logger.info(f"Sent service announcement to {addr[0]}:{response_port}")
+
+        except Exception as e:
+            logger.error(f"Error handling discovery request: {e}")
+
+    def _is_duplicate(self, ip: str) -> bool:
+        """Check whether this source was answered within REPLY_DEDUP_TTL, otherwise record it"""
+        now = time.monotonic()
+        # Entries are kept in reply order, so expired ones are at the front
+        while self._recent:
+            oldest_ip, replied_at = next(iter(self._recent.items()))
+            if (
+                now - replied_at < REPLY_DEDUP_TTL
+                and len(self._recent) < REPLY_DEDUP_MAXSIZE
+            ):
+                break
+            self._recent.popitem(last=False)
+
+        if ip in self._recent:
+            self.suppressed += 1
+            return True
+        self._recent[ip] = now
+        return False
+
+    async def stop(self):
+        """Stop listening"""
+        self.running = False
+        if self._refresh_handle:
+            self._refresh_handle.cancel()
+            self._refresh_handle = None
+        if self.sock:
+            if self.loop:
+                self.loop.remove_reader(self.sock.fileno())
+            self.sock.close()
+            self.sock = None
+        logger.info("Service discovery stopped")
@@ -0,0 +1,42 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+# The pool processes import the RKNN toolkit, the worker imports the task manager
+pytest.importorskip("rknn.api")
+pytest.importorskip("task_manager")
+
+from convertor import converter_worker
+
+
+@pytest.fixture
+def executor():
+    yield converter_worker.start_executor(max_workers=1)
+    converter_worker.shutdown_executor()
+
+
+def test_pool_recovers_after_process_crash(executor):
+    # A pool process dying mid-job (segfault, OOM kill) breaks the whole pool
+    with pytest.raises(BrokenProcessPool):
+        executor.submit(os._exit, 1).result()
+    with pytest.raises(BrokenProcessPool):
+        executor.submit(abs, -3)
+
+    converter_worker._reset_broken_executor(executor)
+
+    # The next task gets a fresh pool and runs normally
+    new_executor = converter_worker.start_executor(max_workers=1)
+    assert new_executor is not executor
+    assert new_executor.submit(abs, -3).result() == 3
+
+
+def test_late_reset_keeps_the_new_pool(executor):
+    with pytest.raises(BrokenProcessPool):
+        executor.submit(os._exit, 1).result()
+    converter_worker._reset_broken_executor(executor)
+    new_executor = converter_worker.start_executor(max_workers=1)
+
+    # Another task that saw the same breakage resets after the pool was rebuilt
+    converter_worker._reset_broken_executor(executor)
+    assert converter_worker.start_executor() is new_executor
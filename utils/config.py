@@ -1,8 +1,12 @@
 import os
+import re
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Sequence, Tuple
 from enum import Enum
 
+# Extension of a TensorFlow variables shard (.data-00000-of-00001, .data-00001-of-00004)
+DATA_SHARD_EXT_RE = re.compile(r"\.data-\d{5}-of-\d{5}$")
+
 
 @dataclass
 class ServerConfig:
@@ -14,7 +18,10 @@ class ServerConfig:
     upload_folder: str = "./uploads"
     output_folder: str = "./outputs"
     temp_folder: str = "./temp"
+    cache_folder: str = "./cache"
     max_file_size: int = 500 * 1024 * 1024  # 500MB
+    upload_chunk_size: int = 1 << 20  # Read size when saving uploaded files (1MB)
+    download_chunk_size: int = 4 << 20  # Read size when sending result files (4MB)
     allowed_extensions: set = field(
         default_factory=lambda: {
             ".onnx",
@@ -36,6 +43,15 @@ class ServerConfig:
         }
     )
 
+    def __post_init__(self):
+        # Uploads compare lowercased extensions, normalize once for hashed lookups
+        self.allowed_extensions = frozenset(e.lower() for e in self.allowed_extensions)
+
+    def is_allowed_extension(self, ext: str) -> bool:
+        """Whether an upload with this extension is accepted, any data shard included"""
+        ext = ext.lower()
+        return ext in self.allowed_extensions or bool(DATA_SHARD_EXT_RE.match(ext))
+
 
 @dataclass
 class ModelFiles:
@@ -46,9 +62,38 @@ class ModelFiles:
     additional_files: List[str] = field(default_factory=list)  # Additional file paths
     model_type: str = ""  # Model type
 
+    def __post_init__(self):
+        # Auxiliary file index (files, extension -> first file, extensions), built on
+        # first use. A plain attribute, not a field: asdict() and __init__ ignore it.
+        self._index = None
+
+    def _secondary_index(self) -> tuple:
+        """Auxiliary file index, rebuilt when secondary_files has changed"""
+        files = tuple(self.secondary_files)
+        if self._index is None or self._index[0] != files:
+            by_ext = {}
+            for path in files:
+                by_ext.setdefault(os.path.splitext(path)[1].lower(), path)
+            self._index = (files, by_ext, frozenset(by_ext))
+        return self._index
+
+    @property
+    def primary_ext(self) -> str:
+        """Lowercased extension of the primary file"""
+        return os.path.splitext(self.primary_file)[1].lower()
+
+    @property
+    def secondary_exts(self) -> frozenset:
+        """Lowercased extensions of the auxiliary files"""
+        return self._secondary_index()[2]
+
+    def get_secondary_file(self, ext: str) -> Optional[str]:
+        """Get the auxiliary file with the given extension (e.g. ".caffemodel")"""
+        return self._secondary_index()[1].get(ext)
+
     def get_all_files(self) -> List[str]:
-        """Get all file paths"""
-        return [self.primary_file] + self.secondary_files
+        """Get all file paths (primary file first)"""
+        return [self.primary_file, *self.secondary_files]
 
     def get_model_name(self) -> str:
         """Extract model name from primary file path"""
@@ -82,8 +127,9 @@ class ModelType(Enum):
 @dataclass
 class RKNNConverterConfig:
     # config for rknn.config
-    mean_values: List[float] = field(default_factory=lambda: [0, 0, 0])
-    std_values: List[float] = field(default_factory=lambda: [255, 255, 255])
+    # Sequence defaults are shared tuples, config() and torch_config() return lists
+    mean_values: Sequence[float] = (0, 0, 0)
+    std_values: Sequence[float] = (255, 255, 255)
     quantized_dtype: str = "w8a8"
     quantized_algorithm: str = "normal"
     quantized_method: str = "channel"
@@ -114,52 +160,62 @@ class RKNNConverterConfig:
     auto_hybrid: bool = False
 
     # torch config
-    input_size_list: List[List] = field(default_factory=lambda: [[1, 3, 224, 224]])
+    input_size_list: Sequence[Sequence[int]] = ((1, 3, 224, 224),)
+
+    # Fields passed to rknn.config() and rknn.build(), in call order
+    _CONFIG_FIELDS = (
+        "mean_values",
+        "std_values",
+        "quantized_dtype",
+        "quantized_algorithm",
+        "quantized_method",
+        "quantized_hybrid_level",
+        "target_platform",
+        "quant_img_RGB2BGR",
+        "float_dtype",
+        "optimization_level",
+        "custom_string",
+        "remove_weight",
+        "compress_weight",
+        "inputs_yuv_fmt",
+        "single_core_mode",
+        "dynamic_input",
+        "model_pruning",
+        "op_target",
+        "quantize_weight",
+        "remove_reshape",
+        "sparse_infer",
+        "enable_flash_attention",
+        "auto_hybrid_cos_thresh",
+        "auto_hybrid_euc_thresh",
+    )
+    _BUILD_CONFIG_FIELDS = (
+        "do_quantization",
+        "dataset",
+        "rknn_batch_size",
+        "auto_hybrid",
+    )
+    # Keys update_config() accepts: every configuration field
+    _VALID_KEYS = frozenset(
+        _CONFIG_FIELDS + _BUILD_CONFIG_FIELDS + ("input_size_list",)
+    )
 
     def config(self) -> dict:
-        return {
-            "mean_values": self.mean_values,
-            "std_values": self.std_values,
-            "quantized_dtype": self.quantized_dtype,
-            "quantized_algorithm": self.quantized_algorithm,
-            "quantized_method": self.quantized_method,
-            "quantized_hybrid_level": self.quantized_hybrid_level,
-            "target_platform": self.target_platform,
-            "quant_img_RGB2BGR": self.quant_img_RGB2BGR,
-            "float_dtype": self.float_dtype,
-            "optimization_level": self.optimization_level,
-            "custom_string": self.custom_string,
-            "remove_weight": self.remove_weight,
-            "compress_weight": self.compress_weight,
-            "inputs_yuv_fmt": self.inputs_yuv_fmt,
-            "single_core_mode": self.single_core_mode,
-            "dynamic_input": self.dynamic_input,
-            "model_pruning": self.model_pruning,
-            "op_target": self.op_target,
-            "quantize_weight": self.quantize_weight,
-            "remove_reshape": self.remove_reshape,
-            "sparse_infer": self.sparse_infer,
-            "enable_flash_attention": self.enable_flash_attention,
-            "auto_hybrid_cos_thresh": self.auto_hybrid_cos_thresh,
-            "auto_hybrid_euc_thresh": self.auto_hybrid_euc_thresh,
-        }
+        config = {key: getattr(self, key) for key in self._CONFIG_FIELDS}
+        config["mean_values"] = list(self.mean_values)
+        config["std_values"] = list(self.std_values)
+        return config
 
     def build_config(self) -> dict:
-        return {
-            "do_quantization": self.do_quantization,
-            "dataset": self.dataset,
-            "rknn_batch_size": self.rknn_batch_size,
-            "auto_hybrid": self.auto_hybrid,
-            # "quant_img_RGB2BGR": self.quant_img_RGB2BGR,
-            # "float_dtype": self.float_dtype
-        }
+        return {key: getattr(self, key) for key in self._BUILD_CONFIG_FIELDS}
 
     def torch_config(self) -> dict:
-        return {"input_size_list": self.input_size_list}
+        return {"input_size_list": [list(shape) for shape in self.input_size_list]}
 
     def update_config(self, config: dict):
+        valid_keys = self._VALID_KEYS
         for key, value in config.items():
-            if hasattr(self, key):
+            if key in valid_keys:
                 setattr(self, key, value)
 
 
@@ -203,9 +259,29 @@ DEFAULT_SERVER_CONFIG = ServerConfig()
 DEFAULT_CONVERTER_CONFIG = RKNNConverterConfig()
 
 
+# Directories already created by this process
+_ENSURED_DIRS = set()
+
+
+def ensure_dir(path: str):
+    """Create a directory (and parents) if it does not exist"""
+    # A directory created before costs a single stat instead of makedirs' walk
+    # over the parents and failing mkdir. The stat still notices a directory
+    # removed at runtime (e.g. cache cleanup), which is then created again.
+    if path in _ENSURED_DIRS and os.path.isdir(path):
+        return
+    os.makedirs(path, exist_ok=True)
+    _ENSURED_DIRS.add(path)
+
+
 # Ensure necessary directories exist
 def ensure_directories():
     """Ensure necessary directories exist"""
     config = DEFAULT_SERVER_CONFIG
-    for folder in [config.upload_folder, config.output_folder, config.temp_folder]:
-        os.makedirs(folder, exist_ok=True)
+    for folder in [
+        config.upload_folder,
+        config.output_folder,
+        config.temp_folder,
+        config.cache_folder,
+    ]:
+        ensure_dir(folder)
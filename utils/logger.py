@@ -1,9 +1,10 @@
 import logging
 import sys
-from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 import os
 
+from utils.config import ensure_dir
+
 
 class ColoredFormatter(logging.Formatter):
     """Colored log formatter"""
@@ -17,26 +18,42 @@ class ColoredFormatter(logging.Formatter):
         "RESET": "\033[0m",  # Reset
     }
 
-    def format(self, record):
-        # Add color
-        if record.levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[record.levelname]}{record.levelname}{self.COLORS['RESET']}"
+    def __init__(self, fmt: Optional[str] = None, datefmt: str = "%Y-%m-%d %H:%M:%S"):
+        super().__init__(fmt, datefmt)
 
-        # Add timestamp
-        record.asctime = datetime.fromtimestamp(record.created).strftime(
-            "%Y-%m-%d %H:%M:%S"
-        )
+    def format(self, record):
+        # Add color, restoring the level name afterwards: the record is shared
+        # with the other handlers of the logger (e.g. the plain file handler)
+        levelname = record.levelname
+        color = self.COLORS.get(levelname)
+        if color is None:
+            return super().format(record)
 
-        return super().format(record)
+        record.levelname = f"{color}{levelname}{self.COLORS['RESET']}"
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
 
 
 class TaskLogger:
     """Task-specific logger"""
 
+    # task_id -> TaskLogger, so every user of a task shares one logger
+    _INSTANCES: Dict[str, "TaskLogger"] = {}
+
+    @classmethod
+    def get(cls, task_id: str, log_dir: str = "./logs") -> "TaskLogger":
+        """Get the logger of a task, creating it on first use"""
+        instance = cls._INSTANCES.get(task_id)
+        if instance is None:
+            instance = cls._INSTANCES[task_id] = cls(task_id, log_dir)
+        return instance
+
     def __init__(self, task_id: str, log_dir: str = "./logs"):
         self.task_id = task_id
         self.log_dir = log_dir
-        os.makedirs(log_dir, exist_ok=True)
+        ensure_dir(log_dir)
 
         # Create task-specific log file
         self.log_file = os.path.join(log_dir, f"task_{task_id}.log")
@@ -45,8 +62,13 @@ class TaskLogger:
         self.logger = logging.getLogger(f"task_{task_id}")
         self.logger.setLevel(logging.DEBUG)
 
-        # File handler
-        file_handler = logging.FileHandler(self.log_file, encoding="utf-8")
+        # Loggers are process-wide, a second instance for the same task must not
+        # attach another set of handlers (duplicate lines, one more open file)
+        if self.logger.handlers:
+            return
+
+        # File handler, the file is only opened on the first record
+        file_handler = logging.FileHandler(self.log_file, encoding="utf-8", delay=True)
         file_handler.setLevel(logging.DEBUG)
         file_formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -64,20 +86,37 @@ class TaskLogger:
         self.logger.addHandler(file_handler)
         self.logger.addHandler(console_handler)
 
-    def info(self, message: str):
-        self.logger.info(f"[{self.task_id}] {message}")
+    def close(self):
+        """Release the task's log file and logger once the task has ended"""
+        if TaskLogger._INSTANCES.get(self.task_id) is self:
+            del TaskLogger._INSTANCES[self.task_id]
+        for handler in self.logger.handlers[:]:
+            self.logger.removeHandler(handler)
+            handler.close()
+        # logging keeps every named logger for the life of the process
+        logging.Logger.manager.loggerDict.pop(self.logger.name, None)
+
+    def _log(self, level: int, message: str, args: tuple):
+        # Format lazily: nothing is built when the level is filtered out
+        if self.logger.isEnabledFor(level):
+            if args:
+                message = message % args
+            self.logger.log(level, "[%s] %s", self.task_id, message)
+
+    def info(self, message: str, *args):
+        self._log(logging.INFO, message, args)
 
-    def error(self, message: str):
-        self.logger.error(f"[{self.task_id}] {message}")
+    def error(self, message: str, *args):
+        self._log(logging.ERROR, message, args)
 
-    def warning(self, message: str):
-        self.logger.warning(f"[{self.task_id}] {message}")
+    def warning(self, message: str, *args):
+        self._log(logging.WARNING, message, args)
 
-    def debug(self, message: str):
-        self.logger.debug(f"[{self.task_id}] {message}")
+    def debug(self, message: str, *args):
+        self._log(logging.DEBUG, message, args)
 
-    def critical(self, message: str):
-        self.logger.critical(f"[{self.task_id}] {message}")
+    def critical(self, message: str, *args):
+        self._log(logging.CRITICAL, message, args)
 
 
 def setup_logger(
@@ -98,7 +137,7 @@ def setup_logger(
         console_handler.setFormatter(console_formatter)
 
         # File handler
-        os.makedirs("./logs", exist_ok=True)
+        ensure_dir("./logs")
         file_handler = logging.FileHandler("./logs/server.log", encoding="utf-8")
         file_handler.setLevel(logging.DEBUG)
         file_formatter = logging.Formatter(
@@ -5,10 +5,9 @@ Used to identify and organize multi-file models
 """
 
 import os
-import re
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple
 from dataclasses import dataclass
-from utils.config import ModelFiles
+from utils.config import ModelFiles, DATA_SHARD_EXT_RE
 
 
 class ModelType:
@@ -23,14 +22,53 @@ class ModelType:
     UNKNOWN = "unknown"
 
 
+# TensorFlow graph definition file extensions
+TF_GRAPH_EXTENSIONS = frozenset({".pb", ".meta"})
+# SavedModel upload extensions: (graph, variables data, variables index)
+SAVED_MODEL_EXTENSIONS = (".pb", ".data-00000-of-00001", ".index")
+# Extension of the only shard of a single-shard variables file
+SINGLE_SHARD_EXT = SAVED_MODEL_EXTENSIONS[1]
+# Checkpoint name suffixes stripped to group files, removed in this order
+CHECKPOINT_SUFFIXES = ("-00000-of-00001", ".data", ".index", ".meta")
+
+
 @dataclass
 class FileInfo:
     """File information"""
 
+    # Slotted: one instance per uploaded file, no per-instance __dict__
+    __slots__ = (
+        "filename",
+        "filepath",
+        "extension",
+        "size",
+        "base_name",
+        "base_name_lower",
+        "_trigrams",
+    )
+
     filename: str
     filepath: str
     extension: str
     size: int
+    base_name: str  # File name without extension
+    base_name_lower: str  # Lowercased base_name, for case-insensitive matching
+
+    def __post_init__(self):
+        # Trigram set of base_name_lower, built on first use (see trigrams)
+        self._trigrams = None
+
+    @property
+    def trigrams(self) -> frozenset:
+        """3-character substrings of the lowercased base name, for fuzzy matching"""
+        if self._trigrams is None:
+            self._trigrams = _trigrams(self.base_name_lower)
+        return self._trigrams
+
+
+def _trigrams(name: str) -> frozenset:
+    """All 3-character substrings of name"""
+    return frozenset(name[i : i + 3] for i in range(len(name) - 2))
 
 
 class ModelFileAnalyzer:
@@ -46,7 +84,14 @@ class ModelFileAnalyzer:
         ModelType.TENSORFLOW: {
             "primary": [".pb", ".meta"],
             "secondary": [".ckpt", ".data", ".index"],
-            "groups": ["checkpoint", ".meta", ".data", ".index"],
+            # Exact file extensions (or whole file names) of a checkpoint series
+            "groups": [
+                "checkpoint",
+                ".meta",
+                ".data",
+                ".data-00000-of-00001",
+                ".index",
+            ],
         },
         # ModelType.TENSORFLOW: {
         #     'primary': ['.pb', '.meta'],
@@ -60,12 +105,30 @@ class ModelFileAnalyzer:
         },
     }
 
+    # (model_type, "pairs" | "groups", patterns) in processing order, flattened once
+    _MULTI_PATTERNS = tuple(
+        (
+            model_type,
+            kind,
+            tuple(patterns[kind]) if kind == "pairs" else frozenset(patterns[kind]),
+        )
+        for model_type, patterns in MULTI_FILE_PATTERNS.items()
+        for kind in ("pairs", "groups")
+        if kind in patterns
+    )
+
     # Single-file model formats
     SINGLE_FILE_PATTERNS = {
         ModelType.ONNX: [".onnx"],
         ModelType.TFLITE: [".tflite"],
         ModelType.PYTORCH: [".pt", ".pth", ".pytorch"],
     }
+    # Extension -> single-file model type, built once from SINGLE_FILE_PATTERNS
+    _EXT_TO_TYPE = {
+        ext: model_type
+        for model_type, extensions in SINGLE_FILE_PATTERNS.items()
+        for ext in extensions
+    }
 
     def __init__(self):
         pass
@@ -83,11 +146,14 @@ class ModelFileAnalyzer:
         # Convert to FileInfo objects
         file_infos = []
         for file_data in uploaded_files:
+            base_name, extension = os.path.splitext(file_data["original_name"])
             file_info = FileInfo(
                 filename=file_data["original_name"],
                 filepath=file_data["path"],
-                extension=os.path.splitext(file_data["original_name"])[1].lower(),
+                extension=extension.lower(),
                 size=file_data["size"],
+                base_name=base_name,
+                base_name_lower=base_name.lower(),
             )
             file_infos.append(file_info)
 
@@ -100,33 +166,28 @@ class ModelFileAnalyzer:
         """Organize file information into model file groups"""
         model_groups = []
         used_files = set()
-        if len(file_infos) == 3:
-            pb_file = None
-            index_file = None
-            data_file = None
-            for file_info in file_infos:
-                if file_info.extension == ".pb":
-                    pb_file = file_info.filepath
-                elif file_info.extension == ".index":
-                    index_file = file_info.filepath
-                elif file_info.extension == ".data-00000-of-00001":
-                    data_file = file_info.filepath
-            if pb_file and index_file and data_file:
-                model_groups.append(
-                    ModelFiles(
-                        primary_file=pb_file,
-                        secondary_files=[data_file],
-                        additional_files=[index_file],
-                        model_type=ModelType.TENSORFLOW,
-                    )
-                )
-            return model_groups
 
-        # 1. Process multi-file models
-        for model_type, patterns in self.MULTI_FILE_PATTERNS.items():
-            groups = self._find_multi_file_groups(
-                file_infos, model_type, patterns, used_files
+        # Index files once: by extension, and by (extension, base name) for pairing
+        by_ext = {}
+        by_name = {}
+        for file_info in file_infos:
+            by_ext.setdefault(file_info.extension, []).append(file_info)
+            by_name.setdefault((file_info.extension, file_info.base_name), []).append(
+                file_info
             )
+
+        # 1. Process multi-file models
+        for model_type, kind, patterns in self._MULTI_PATTERNS:
+            if kind == "pairs":
+                # Process paired files (e.g., Caffe's .prototxt and .caffemodel)
+                groups = self._find_paired_files(
+                    by_ext, by_name, model_type, patterns, used_files
+                )
+            else:
+                # Process file groups (e.g., TensorFlow's checkpoint series files)
+                groups = self._find_grouped_files(
+                    file_infos, by_ext, model_type, patterns, used_files
+                )
             model_groups.extend(groups)
 
         # 2. Process remaining single-file models
@@ -144,39 +205,12 @@ class ModelFileAnalyzer:
 
         return model_groups
 
-    def _find_multi_file_groups(
-        self,
-        file_infos: List[FileInfo],
-        model_type: str,
-        patterns: Dict,
-        used_files: set,
-    ) -> List[ModelFiles]:
-        """Find multi-file model groups"""
-        groups = []
-
-        if "pairs" in patterns:
-            # Process paired files (e.g., Caffe's .prototxt and .caffemodel)
-            groups.extend(
-                self._find_paired_files(
-                    file_infos, model_type, patterns["pairs"], used_files
-                )
-            )
-
-        if "groups" in patterns:
-            # Process file groups (e.g., TensorFlow's checkpoint series files)
-            groups.extend(
-                self._find_grouped_files(
-                    file_infos, model_type, patterns["groups"], used_files
-                )
-            )
-
-        return groups
-
     def _find_paired_files(
         self,
-        file_infos: List[FileInfo],
+        by_ext: Dict[str, List[FileInfo]],
+        by_name: Dict[Tuple[str, str], List[FileInfo]],
         model_type: str,
-        pairs: List[Tuple[str, str]],
+        pairs: Tuple[Tuple[str, str], ...],
         used_files: set,
     ) -> List[ModelFiles]:
         """Find paired files"""
@@ -185,9 +219,7 @@ class ModelFileAnalyzer:
         for primary_ext, secondary_ext in pairs:
             # Find primary files
             primary_files = [
-                f
-                for f in file_infos
-                if f.extension == primary_ext and f.filepath not in used_files
+                f for f in by_ext.get(primary_ext, ()) if f.filepath not in used_files
             ]
 
             for primary_file in primary_files:
@@ -195,19 +227,14 @@ class ModelFileAnalyzer:
                 secondary_files = []
 
                 # First try exact base name matching
-                base_name = os.path.splitext(primary_file.filename)[0]
-                for file_info in file_infos:
-                    if (
-                        file_info.extension == secondary_ext
-                        and file_info.filepath not in used_files
-                        and os.path.splitext(file_info.filename)[0] == base_name
-                    ):
+                for file_info in by_name.get((secondary_ext, primary_file.base_name), ()):
+                    if file_info.filepath not in used_files:
                         secondary_files.append(file_info.filepath)
 
                 # If no exact match found, try fuzzy matching
                 if not secondary_files:
                     secondary_files = self._find_fuzzy_match(
-                        primary_file, secondary_ext, file_infos, used_files
+                        primary_file, by_ext.get(secondary_ext, ()), used_files
                     )
 
                 if secondary_files:
@@ -228,85 +255,51 @@ class ModelFileAnalyzer:
     def _find_fuzzy_match(
         self,
         primary_file: FileInfo,
-        secondary_ext: str,
-        file_infos: List[FileInfo],
+        candidates: List[FileInfo],
         used_files: set,
     ) -> List[str]:
-        """Fuzzy match auxiliary files"""
-        secondary_files = []
-        primary_base = os.path.splitext(primary_file.filename)[0].lower()
+        """Fuzzy match auxiliary files among the candidates with the auxiliary extension"""
+        matching_files = [f for f in candidates if f.filepath not in used_files]
 
-        # For Caffe models, try multiple matching strategies
-        for file_info in file_infos:
-            if (
-                file_info.extension == secondary_ext
-                and file_info.filepath not in used_files
-            ):
+        # Only one file with the corresponding extension: it is paired whatever its
+        # name, so skip the name comparisons (the common single-model upload)
+        if len(matching_files) == 1:
+            return [matching_files[0].filepath]
 
-                secondary_base = os.path.splitext(file_info.filename)[0].lower()
+        primary_base = primary_file.base_name_lower
 
-                # Strategy 1: Check for common keywords
-                if self._has_common_keywords(primary_base, secondary_base):
-                    secondary_files.append(file_info.filepath)
-                    break
+        # For Caffe models, try multiple matching strategies
+        for file_info in matching_files:
+            secondary_base = file_info.base_name_lower
 
-                # Strategy 2: Check if one name contains the other
-                elif primary_base in secondary_base or secondary_base in primary_base:
-                    secondary_files.append(file_info.filepath)
-                    break
+            # Strategy 1: Check for common keywords
+            if self._has_common_keywords(primary_file, file_info):
+                return [file_info.filepath]
 
-        # If still not found and there's only one file with the corresponding extension, pair it
-        if not secondary_files:
-            matching_files = [
-                f
-                for f in file_infos
-                if f.extension == secondary_ext and f.filepath not in used_files
-            ]
-            if len(matching_files) == 1:
-                secondary_files.append(matching_files[0].filepath)
+            # Strategy 2: Check if one name contains the other
+            elif primary_base in secondary_base or secondary_base in primary_base:
+                return [file_info.filepath]
 
-        return secondary_files
+        return []
 
-    def _has_common_keywords(self, name1: str, name2: str) -> bool:
+    def _has_common_keywords(self, file1: FileInfo, file2: FileInfo) -> bool:
         """Check if two filenames have common keywords"""
-        # Common model name keywords
-        keywords = [
-            "googlenet",
-            "resnet",
-            "vgg",
-            "alexnet",
-            "mobilenet",
-            "squeezenet",
-            "densenet",
-            "inception",
-            "yolo",
-            "ssd",
-        ]
-
-        for keyword in keywords:
-            if keyword in name1 and keyword in name2:
-                return True
-
-        # Check for common substrings of 3+ characters
-        for i in range(len(name1) - 2):
-            for j in range(
-                3, min(len(name1) - i + 1, 8)
-            ):  # Check up to 7 characters max
-                substr = name1[i : i + j]
-                if len(substr) >= 3 and substr in name2:
-                    return True
-
-        return False
+        # Any common substring of 3+ characters shares a 3-character substring, so
+        # one set test covers it. Model name keywords (googlenet, resnet, vgg, yolo,
+        # ssd, ...) are all 3+ characters long and are matched by the same test
+        return not file1.trigrams.isdisjoint(file2.trigrams)
 
     def _find_grouped_files(
         self,
         file_infos: List[FileInfo],
+        by_ext: Dict[str, List[FileInfo]],
         model_type: str,
-        group_patterns: List[str],
+        group_keys: frozenset,
         used_files: set,
     ) -> List[ModelFiles]:
         """Find file groups (e.g., TensorFlow checkpoint series)"""
-        groups = []
+        # SavedModel uploads first: graph, variables data and index
+        groups = self._find_saved_model_files(by_ext, model_type, used_files)
 
         # Group by base name
         base_groups = {}
@@ -314,16 +307,15 @@ class ModelFileAnalyzer:
             if file_info.filepath in used_files:
                 continue
 
-            # Check if it matches any group pattern
-            matches_pattern = False
-            for pattern in group_patterns:
-                if pattern in file_info.filename or file_info.extension in pattern:
-                    matches_pattern = True
-                    break
-
-            if matches_pattern:
+            # Check if it matches any group pattern: exact extension or file name,
+            # or any shard of a multi-shard variables file
+            if (
+                file_info.extension in group_keys
+                or file_info.filename in group_keys
+                or DATA_SHARD_EXT_RE.match(file_info.extension)
+            ):
                 # Extract base name
-                base_name = self._extract_base_name(file_info.filename, group_patterns)
+                base_name = self._extract_base_name(file_info.base_name, group_keys)
                 if base_name not in base_groups:
                     base_groups[base_name] = []
                 base_groups[base_name].append(file_info)
@@ -336,7 +328,7 @@ class ModelFileAnalyzer:
                 secondary_files = []
 
                 for file_info in files:
-                    if file_info.extension in [".meta", ".pb"]:
+                    if file_info.extension in TF_GRAPH_EXTENSIONS:
                         primary_file = file_info.filepath
                     else:
                         secondary_files.append(file_info.filepath)
@@ -355,27 +347,77 @@ class ModelFileAnalyzer:
 
         return groups
 
-    def _extract_base_name(self, filename: str, patterns: List[str]) -> str:
-        """Extract base name from filename"""
-        base_name = filename
+    def _find_saved_model_files(
+        self,
+        by_ext: Dict[str, List[FileInfo]],
+        model_type: str,
+        used_files: set,
+    ) -> List[ModelFiles]:
+        """Find SavedModel file trios (.pb, variables data shards, .index)"""
+        groups = []
+
+        # SavedModel file names do not relate to each other (saved_model.pb,
+        # variables.index, ...), so trios are formed in upload order
+        pb_files, index_files = (
+            [f for f in by_ext.get(ext, ()) if f.filepath not in used_files]
+            for ext in (SAVED_MODEL_EXTENSIONS[0], SAVED_MODEL_EXTENSIONS[2])
+        )
+        data_sets = self._find_data_shard_sets(by_ext, used_files)
+        for pb_file, data_files, index_file in zip(pb_files, data_sets, index_files):
+            groups.append(
+                ModelFiles(
+                    primary_file=pb_file.filepath,
+                    secondary_files=[f.filepath for f in data_files],
+                    additional_files=[index_file.filepath],
+                    model_type=model_type,
+                )
+            )
+            used_files.add(pb_file.filepath)
+            used_files.add(index_file.filepath)
+            used_files.update(f.filepath for f in data_files)
+
+        return groups
 
-        # Remove extension
-        base_name = os.path.splitext(base_name)[0]
+    def _find_data_shard_sets(
+        self, by_ext: Dict[str, List[FileInfo]], used_files: set
+    ) -> List[List[FileInfo]]:
+        """Variables data files, one list of shards per variables file in shard order"""
+        # Single-shard files (the common case) are complete on their own
+        data_sets = [
+            [f]
+            for f in by_ext.get(SINGLE_SHARD_EXT, ())
+            if f.filepath not in used_files
+        ]
 
-        # Remove common suffixes
-        suffixes_to_remove = ["-00000-of-00001", ".data", ".index", ".meta"]
-        for suffix in suffixes_to_remove:
-            if base_name.endswith(suffix):
-                base_name = base_name[: -len(suffix)]
+        # Multi-shard files: collect every shard of the same base name and count
+        shards = {}
+        for ext, files in by_ext.items():
+            if ext == SINGLE_SHARD_EXT or not DATA_SHARD_EXT_RE.match(ext):
+                continue
+            for f in files:
+                if f.filepath not in used_files:
+                    # ".data-00001-of-00004" -> (base name, "00004")
+                    shards.setdefault((f.base_name, ext[-5:]), []).append(f)
+        for files in shards.values():
+            # Zero-padded shard numbers sort in shard order
+            files.sort(key=lambda f: f.extension)
+            data_sets.append(files)
+
+        return data_sets
+
+    def _extract_base_name(self, base_name: str, patterns: frozenset) -> str:
+        """Extract group base name from a file name without extension"""
+        # Remove common suffixes, most names carry none: one tuple check settles those
+        if base_name.endswith(CHECKPOINT_SUFFIXES):
+            for suffix in CHECKPOINT_SUFFIXES:
+                if base_name.endswith(suffix):
+                    base_name = base_name[: -len(suffix)]
 
         return base_name
 
     def _identify_single_file_type(self, extension: str) -> str:
         """Identify single-file model type"""
-        for model_type, extensions in self.SINGLE_FILE_PATTERNS.items():
-            if extension in extensions:
-                return model_type
-        return ModelType.UNKNOWN
+        return self._EXT_TO_TYPE.get(extension, ModelType.UNKNOWN)
 
     def validate_model_files(self, model_files: ModelFiles) -> Tuple[bool, str]:
         """
@@ -405,34 +447,24 @@ class ModelFileAnalyzer:
 
     def _validate_caffe_files(self, model_files: ModelFiles) -> Tuple[bool, str]:
         """Validate Caffe model files"""
-        primary_ext = os.path.splitext(model_files.primary_file)[1].lower()
-
-        if primary_ext == ".prototxt":
+        if model_files.primary_ext == ".prototxt":
             # Primary file is prototxt, should have corresponding caffemodel
             if not model_files.secondary_files:
                 return False, "Caffe model missing .caffemodel weight file"
 
-            caffemodel_found = any(
-                f.endswith(".caffemodel") for f in model_files.secondary_files
-            )
-            if not caffemodel_found:
+            if ".caffemodel" not in model_files.secondary_exts:
                 return False, "Caffe model missing .caffemodel weight file"
 
         return True, ""
 
     def _validate_darknet_files(self, model_files: ModelFiles) -> Tuple[bool, str]:
         """Validate Darknet model files"""
-        primary_ext = os.path.splitext(model_files.primary_file)[1].lower()
-
-        if primary_ext == ".cfg":
+        if model_files.primary_ext == ".cfg":
             # Primary file is cfg, should have corresponding weights
             if not model_files.secondary_files:
                 return False, "Darknet model missing .weights weight file"
 
-            weights_found = any(
-                f.endswith(".weights") for f in model_files.secondary_files
-            )
-            if not weights_found:
+            if ".weights" not in model_files.secondary_exts:
                 return False, "Darknet model missing .weights weight file"
 
         return True, ""
@@ -440,11 +472,11 @@ class ModelFileAnalyzer:
     def _validate_tensorflow_files(self, model_files: ModelFiles) -> Tuple[bool, str]:
         """Validate TensorFlow model files"""
         # TensorFlow model validation is relatively complex, basic checks here
-        all_files = model_files.get_all_files()
-        extensions = [os.path.splitext(f)[1].lower() for f in all_files]
-
         # Check for necessary file types
-        has_graph = any(ext in [".pb", ".meta"] for ext in extensions)
+        has_graph = (
+            model_files.primary_ext in TF_GRAPH_EXTENSIONS
+            or not model_files.secondary_exts.isdisjoint(TF_GRAPH_EXTENSIONS)
+        )
         if not has_graph:
             return (
                 False,
@@ -0,0 +1,42 @@
+"""
+Task change notifications
+Lets request handlers wait for a task's state to change instead of polling it
+"""
+
+import asyncio
+from typing import Dict, List
+
+
+class TaskNotifier:
+    """Wakes up the coroutines waiting on a task when the task changes"""
+
+    def __init__(self):
+        # task_id -> [event, number of waiters], only while someone is waiting
+        self._waiting: Dict[str, List] = {}
+
+    def notify(self, task_id: str):
+        """Wake every coroutine currently waiting on the task"""
+        entry = self._waiting.pop(task_id, None)
+        if entry is not None:
+            entry[0].set()
+
+    async def wait(self, task_id: str, timeout: float) -> bool:
+        """Wait for the next change of the task, return False on timeout"""
+        entry = self._waiting.get(task_id)
+        if entry is None:
+            entry = self._waiting[task_id] = [asyncio.Event(), 0]
+        entry[1] += 1
+        try:
+            await asyncio.wait_for(entry[0].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            # The last waiter to give up removes the entry, nothing is kept per task
+            entry[1] -= 1
+            if not entry[1] and self._waiting.get(task_id) is entry:
+                del self._waiting[task_id]
+
+
+# Global notifier instance
+task_notifier = TaskNotifier()